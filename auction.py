@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import codecs
+import bisect
+import resource
+from array import array
+from itertools import accumulate
+
+import logger
+
+
+TIME_LEFT = {
+    "SHORT": 0,
+    "MEDIUM": 1,
+    "LONG": 2,
+    "VERY_LONG": 3,
+}
+
+
+class AuctionStreamParser:
+    """
+    경매장 덤프 JSON을 조각(chunk) 단위로 받아 auctions 배열의 각 항목을 하나씩 파싱합니다.
+    전체 문서를 메모리에 올리지 않고, 아직 완성되지 않은 마지막 항목만 버퍼에 남겨 둡니다.
+    각 경매는 (아이템 ID, 입찰가, 즉시 구매가, 수량, 남은 시간) 튜플로 변환되며, 아이템
+    ID가 없는 항목은 건너뛰고 skipped에 셉니다. done은 auctions 배열을 끝까지 읽었는지입니다.
+    """
+    MAX_PENDING = 1024 * 1024
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._in_array = False
+        self.done = False
+        self.skipped = 0
+
+    def feed(self, chunk):
+        self._buffer += self._utf8.decode(chunk)
+        records = list()
+        if self.done:
+            return records
+
+        if not self._in_array:
+            start = self._buffer.find('"auctions"')
+            if start < 0:
+                # "auctions" 키가 조각 경계에 걸칠 수 있으므로 끝부분만 남깁니다.
+                self._buffer = self._buffer[-len('"auctions"'):]
+                return records
+            bracket = self._buffer.find("[", start)
+            if bracket < 0:
+                self._buffer = self._buffer[start:]
+                return records
+            self._buffer = self._buffer[bracket + 1:]
+            self._in_array = True
+
+        pos, buffer, length = 0, self._buffer, len(self._buffer)
+        while True:
+            while pos < length and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= length:
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                pos = length
+                break
+            try:
+                auction, end = self._decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if length - pos > self.MAX_PENDING:
+                    raise
+                break
+            record = self.to_record(auction)
+            if record is None:
+                self.skipped += 1
+            else:
+                records.append(record)
+            pos = end
+        self._buffer = buffer[pos:]
+        return records
+
+    @staticmethod
+    def to_record(auction):
+        if not isinstance(auction, dict) or "item" not in auction:
+            return None
+        return (
+            auction["item"],
+            auction.get("bid", 0),
+            auction.get("buyout", 0),
+            auction.get("quantity", 1),
+            TIME_LEFT.get(auction.get("timeLeft"), 0))
+
+
+class AuctionSnapshot:
+    """
+    경매장 스냅샷 하나를 열(column) 단위 배열로 저장합니다. 경매마다 dict를 만드는 대신
+    아이템 ID, 입찰가, 즉시 구매가, 수량, 남은 시간을 각각 array에 담습니다.
+    build_index()를 호출하면 (아이템 ID, 개당 즉시 구매가) 순으로 정렬하고 아이템별 구간을
+    기록하므로, 아이템 하나의 가격 통계는 해당 구간만 보고 계산할 수 있습니다.
+
+    Parameters
+    ---
+    realm_name : 서버 이름
+    last_modified : 경매장 덤프의 lastModified 값 (밀리초)
+    """
+    def __init__(self, realm_name, last_modified):
+        self.realm_name = realm_name
+        self.last_modified = last_modified
+        self.item = array("I")
+        self.bid = array("q")
+        self.buyout = array("q")
+        self.quantity = array("I")
+        self.time_left = array("B")
+        self.unit = array("q")
+        self.stats = dict()
+        self._index = dict()
+
+    def __len__(self):
+        return len(self.item)
+
+    def append(self, record):
+        item, bid, buyout, quantity, time_left = record
+        self.item.append(item)
+        self.bid.append(bid)
+        self.buyout.append(buyout)
+        self.quantity.append(quantity)
+        self.time_left.append(time_left)
+
+    def build_index(self):
+        unit = [b // q if q > 0 else b for b, q in zip(self.buyout, self.quantity)]
+        order = sorted(range(len(self.item)), key=unit.__getitem__)
+        order.sort(key=self.item.__getitem__)
+
+        self.item = array("I", map(self.item.__getitem__, order))
+        self.bid = array("q", map(self.bid.__getitem__, order))
+        self.buyout = array("q", map(self.buyout.__getitem__, order))
+        self.quantity = array("I", map(self.quantity.__getitem__, order))
+        self.time_left = array("B", map(self.time_left.__getitem__, order))
+        self.unit = array("q", map(unit.__getitem__, order))
+
+        self._index.clear()
+        start = 0
+        for item_id in sorted(set(self.item)):
+            end = bisect.bisect_right(self.item, item_id, start)
+            self._index[item_id] = (start, end)
+            start = end
+
+    def __contains__(self, item_id):
+        return item_id in self._index
+
+    def items(self):
+        return self._index.keys()
+
+    def price_stats(self, item_id, percentiles=(25, 50, 75)):
+        """
+        아이템의 등록 건수, 총 수량, 개당 최저가와 수량 가중 백분위 가격을 리턴합니다.
+        즉시 구매가가 없는 경매는 수량에는 포함하지만 가격 계산에서는 제외합니다.
+        """
+        if item_id not in self._index:
+            return None
+        start, end = self._index[item_id]
+        priced = bisect.bisect_right(self.unit, 0, start, end)
+
+        result = {
+            "auctions": end - start,
+            "quantity": sum(self.quantity[start:end]),
+            "min": None,
+            "percentiles": dict(),
+        }
+        if priced == end:
+            return result
+
+        units = self.unit[priced:end]
+        cumulative = list(accumulate(self.quantity[priced:end]))
+        result["min"] = units[0]
+        for p in percentiles:
+            i = bisect.bisect_left(cumulative, cumulative[-1] * p / 100)
+            result["percentiles"][p] = units[min(i, len(units) - 1)]
+        return result
+
+
+class AuctionHouse:
+    """서버별 최신 경매장 스냅샷을 보관합니다."""
+    _snapshots = dict()
+
+    @classmethod
+    def get(cls, realm_name):
+        return cls._snapshots.get(realm_name)
+
+    @classmethod
+    def set(cls, realm_name, snapshot):
+        cls._snapshots[realm_name] = snapshot
+
+
+async def ingest(response, sink, chunk_size=64 * 1024):
+    """
+    경매장 덤프 응답 본문을 스트리밍으로 읽으면서 각 경매 레코드를 sink로 넘깁니다.
+    스냅샷 하나를 처리하는 데 걸린 시간, 받은 바이트 수, 처리 중 최대 RSS를 리턴합니다.
+    auctions 배열이 끝나기 전에 본문이 끝났다면 일부만 받은 덤프이므로 None을 리턴합니다.
+
+    Parameters
+    ---
+    response : 경매장 덤프 URL에 대한 aiohttp 응답
+    sink : 레코드 튜플을 하나씩 받는 함수
+    chunk_size : 한 번에 읽을 바이트 수
+    """
+    parser = AuctionStreamParser()
+    started = time.perf_counter()
+    received, count, peak_rss = 0, 0, _rss()
+
+    async for chunk in response.content.iter_chunked(chunk_size):
+        received += len(chunk)
+        for record in parser.feed(chunk):
+            sink(record)
+            count += 1
+        peak_rss = max(peak_rss, _rss())
+
+    if not parser.done:
+        logger.error("Auction dump ended before the auctions array was closed ({} bytes, {} auctions).",
+            received, count)
+        return None
+
+    stats = {
+        "auctions": count,
+        "skipped": parser.skipped,
+        "bytes": received,
+        "seconds": time.perf_counter() - started,
+        "peak_rss": peak_rss,
+    }
+    logger.info("Ingested {} auctions ({} skipped, {} bytes) in {:.2f}s, peak RSS {:.1f}MB.",
+        count, parser.skipped, received, stats["seconds"], peak_rss / 1024 / 1024)
+    return stats
+
+
+def _rss():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,251 @@
+"""
+벤치마크용 mock 서버가 돌려주는 응답 데이터입니다. 실제 API 응답과 같은 구조와 비슷한
+크기를 갖도록 seed로 고정된 난수로 만들어집니다.
+"""
+import random
+
+
+REALMS = [
+    ("헬스크림", "hellscream"), ("아즈샤라", "azshara"), ("듀로탄", "durotan"),
+    ("불타는 군단", "burning-legion"), ("하이잘", "hyjal"), ("윈드러너", "windrunner"),
+    ("굴단", "guldan"), ("세나리우스", "cenarius"), ("달라란", "dalaran"),
+    ("데스윙", "deathwing"), ("말퓨리온", "malfurion"), ("노르간논", "norgannon"),
+    ("렉사르", "rexxar"), ("알렉스트라자", "alexstrasza"), ("가로나", "garona"),
+    ("와일드해머", "wildhammer"), ("줄진", "zuljin"), ("스톰레이지", "stormrage"),
+]
+RACES = [(1, "인간"), (2, "오크"), (3, "드워프"), (4, "나이트 엘프"), (5, "언데드"),
+         (6, "타우렌"), (7, "노움"), (8, "트롤"), (9, "고블린"), (10, "블러드 엘프")]
+CLASSES = [(1, "전사"), (2, "성기사"), (3, "사냥꾼"), (4, "도적"), (5, "사제"),
+           (6, "죽음의 기사"), (7, "주술사"), (8, "마법사"), (9, "흑마법사"),
+           (10, "수도사"), (11, "드루이드"), (12, "악마사냥꾼")]
+CLASS_SPECS = {
+    1: ["무기", "분노", "방어"], 2: ["신성", "보호", "징벌"], 3: ["야수", "사격", "생존"],
+    4: ["암살", "무법", "잠행"], 5: ["수양", "신성", "암흑"], 6: ["혈기", "냉기", "부정"],
+    7: ["정기", "고양", "복원"], 8: ["비전", "화염", "냉기"], 9: ["고통", "악마", "파괴"],
+    10: ["양조", "운무", "풍운"], 11: ["조화", "야성", "수호", "회복"], 12: ["파멸", "복수"],
+}
+DUNGEONS = [
+    (244, "Atal'Dazar", "아탈다자르"), (245, "Freehold", "자유지대"),
+    (246, "Tol Dagor", "톨 다고르"), (247, "The MOTHERLODE!!", "왕노다지 광산!!"),
+    (248, "Waycrest Manor", "웨이크레스트 저택"), (249, "Kings' Rest", "왕들의 안식처"),
+    (250, "Temple of Sethraliss", "세스랄리스 사원"), (251, "The Underrot", "썩은굴"),
+    (252, "Shrine of the Storm", "폭풍의 사원"), (353, "Siege of Boralus", "보랄러스 공성전"),
+]
+SLOTS = ["HEAD", "NECK", "SHOULDER", "BACK", "CHEST", "WRIST", "HANDS", "WAIST",
+         "LEGS", "FEET", "FINGER_1", "FINGER_2", "TRINKET_1", "TRINKET_2", "MAIN_HAND"]
+LOREM = ("적에게 {}의 피해를 입히고 {}초 동안 이동 속도를 {}% 감소시킵니다. "
+         "이 효과는 최대 {}번 중첩됩니다.\r\n\r\n")
+
+
+def character(name, seed):
+    rng = random.Random("{}-{}".format(name, seed))
+    bosses = [{
+        "id": i,
+        "name": "우두머리{}".format(i),
+        "lfrKills": rng.randint(0, 10),
+        "normalKills": rng.randint(0, 10),
+        "heroicKills": rng.randint(0, 8),
+        "mythicKills": rng.randint(0, 3),
+    } for i in range(9)]
+    items = {
+        "averageItemLevel": rng.randint(400, 440),
+        "averageItemLevelEquipped": rng.randint(400, 440),
+    }
+    for slot in SLOTS:
+        items[slot.lower()] = {
+            "id": rng.randint(150000, 170000),
+            "name": "아이템 {}".format(slot),
+            "icon": "inv_misc_{}".format(slot.lower()),
+            "quality": 4,
+            "itemLevel": rng.randint(400, 445),
+            "tooltipParams": {"enchant": rng.randint(5000, 6000), "timewalkerLevel": 120},
+            "stats": [{"stat": rng.choice([32, 36, 40, 49]), "amount": rng.randint(50, 500)}
+                      for _ in range(4)],
+            "armor": rng.randint(0, 500),
+            "context": "raid-mythic",
+            "bonusLists": [rng.randint(1000, 6000) for _ in range(4)],
+            "artifactId": 0,
+            "displayInfoId": rng.randint(100000, 200000),
+            "artifactAppearanceId": 0,
+            "artifactTraits": [],
+            "relics": [],
+            "appearance": {},
+            "azeriteItem": {"azeriteLevel": rng.randint(50, 80), "azeriteExperience": 1000,
+                            "azeriteExperienceRemaining": 100000},
+            "azeriteEmpoweredItem": {"azeritePowers": [
+                {"id": rng.randint(1, 600), "tier": t, "spellId": rng.randint(1, 300000),
+                 "bonusListId": 0} for t in range(5)]},
+        }
+    return {
+        "lastModified": 1571234567000 + rng.randint(0, 10 ** 8),
+        "name": name,
+        "realm": "헬스크림",
+        "battlegroup": "Gyeongjang",
+        "class": rng.randint(1, 12),
+        "race": rng.randint(1, 10),
+        "gender": rng.randint(0, 1),
+        "level": 120,
+        "achievementPoints": rng.randint(5000, 30000),
+        "thumbnail": "hellscream/{}/{}-avatar.jpg".format(rng.randint(1, 255), rng.randint(10 ** 8, 10 ** 9)),
+        "calcClass": "Z",
+        "faction": rng.randint(0, 1),
+        "guild": {"name": "형님 보셨죠 이런게 바로 컨트롤이에요", "realm": "헬스크림",
+                  "battlegroup": "Gyeongjang", "members": 500, "achievementPoints": 3000,
+                  "emblem": {"icon": 1, "iconColor": "ff000000", "border": 1,
+                             "borderColor": "ff000000", "backgroundColor": "ff000000"}},
+        "items": items,
+        "stats": {
+            "health": rng.randint(100000, 300000), "powerType": "mana", "power": 50000,
+            "str": rng.randint(0, 10000), "agi": rng.randint(0, 10000),
+            "int": rng.randint(0, 10000), "sta": rng.randint(10000, 30000),
+            "crit": rng.uniform(10, 40), "haste": rng.uniform(10, 40),
+            "mastery": rng.uniform(10, 60), "versatilityDamageDoneBonus": rng.uniform(0, 15),
+            "critRating": rng.randint(0, 2000), "hasteRating": rng.randint(0, 2000),
+            "masteryRating": rng.randint(0, 2000), "versatility": rng.randint(0, 2000),
+            "leech": 0.0, "avoidance": 0.0, "speed": 0.0, "armor": rng.randint(1000, 5000),
+            "dodge": 3.0, "parry": 3.0, "block": 0.0, "mainHandDps": 500.0,
+        },
+        "progression": {"raids": [{
+            "name": "레이드{}".format(i), "lfr": 0, "normal": 0, "heroic": 0, "mythic": 0,
+            "id": 9000 + i, "bosses": bosses,
+        } for i in range(24)]},
+    }
+
+
+def character_items(name, seed):
+    rng = random.Random("{}-items-{}".format(name, seed))
+    equipped = list()
+    for slot in SLOTS:
+        item = {
+            "item": {"key": {"href": "https://kr.api.blizzard.com/data/wow/item/1"},
+                     "id": rng.randint(150000, 170000)},
+            "slot": {"type": slot, "name": slot.lower()},
+            "quantity": 1,
+            "context": 6,
+            "bonus_list": [rng.randint(1000, 6000) for _ in range(4)],
+            "quality": {"type": "EPIC", "name": "영웅"},
+            "name": "아이템 {}".format(slot),
+            "modified_appearance_id": rng.randint(1, 100000),
+            "media": {"key": {"href": "https://kr.api.blizzard.com/data/wow/media/item/1"},
+                      "id": rng.randint(1, 100000)},
+            "item_class": {"name": "방어구", "id": 4},
+            "item_subclass": {"name": "판금", "id": 4},
+            "inventory_type": {"type": slot, "name": slot.lower()},
+            "binding": {"type": "ON_ACQUIRE", "name": "획득 시 귀속"},
+            "armor": {"value": rng.randint(100, 500), "display_string": "방어도"},
+            "stats": [{"type": {"type": "CRIT_RATING", "name": "치명타"}, "value": rng.randint(50, 500),
+                       "display_string": "+100 치명타"} for _ in range(3)],
+            "level": {"value": rng.randint(400, 445), "display_string": "아이템 레벨"},
+            "durability": {"value": 100, "display_string": "내구도 100 / 100"},
+        }
+        if slot in ["HEAD", "SHOULDER", "CHEST"]:
+            item["azerite_details"] = {"selected_powers": [{
+                "id": rng.randint(1, 600), "tier": t,
+                "spell_tooltip": {"spell": {"name": "아제라이트 특성 {}".format(t), "id": 1},
+                                  "description": LOREM.format(1, 2, 3, 4), "cast_time": "즉시"},
+            } for t in range(5)]}
+        if slot == "NECK":
+            item["azerite_details"] = {"selected_essences": [{
+                "slot": s, "rank": rng.randint(1, 3),
+                "essence": {"name": "정수 {}".format(s), "id": s},
+            } for s in range(3)]}
+        if rng.random() < 0.5:
+            item["transmog"] = {"item": {"name": "형상 {}".format(slot), "id": rng.randint(1, 170000)}}
+        equipped.append(item)
+    return {"_links": {"self": {"href": ""}}, "character": {"name": name}, "equipped_items": equipped}
+
+
+def character_media(name, seed):
+    return {
+        "_links": {"self": {"href": ""}},
+        "character": {"name": name, "id": 1},
+        "avatar_url": "https://render-kr.worldofwarcraft.com/character/{}-avatar.jpg".format(name),
+        "bust_url": "https://render-kr.worldofwarcraft.com/character/{}-inset.jpg".format(name),
+        "render_url": "https://render-kr.worldofwarcraft.com/character/{}-main.jpg".format(name),
+    }
+
+
+def character_talents(name, seed):
+    rng = random.Random("{}-{}".format(name, seed))
+    class_id = rng.randint(1, 12)
+    talents = list()
+    for i, spec in enumerate(CLASS_SPECS[class_id]):
+        talents.append({
+            "selected": i == 0,
+            "talents": [{
+                "tier": t, "column": rng.randint(0, 2),
+                "spell": {"id": rng.randint(1, 300000), "name": "특성 {}-{}".format(t, i),
+                          "icon": "spell_icon", "description": LOREM.format(t, i, 10, 3),
+                          "castTime": "즉시"},
+            } for t in range(7)],
+            "spec": {"name": spec, "role": "DPS", "backgroundImage": "bg",
+                     "icon": "spec_icon", "description": "전문화 설명", "order": i},
+            "calcTalent": "0120120", "calcSpec": "a",
+        })
+    return {"lastModified": 1571234567000, "name": name, "realm": "헬스크림", "class": class_id,
+            "race": rng.randint(1, 10), "faction": rng.randint(0, 1), "level": 120,
+            "talents": talents}
+
+
+def raider_character(name, seed):
+    rng = random.Random("{}-raider-{}".format(name, seed))
+    runs = list()
+    if rng.random() < 0.8:
+        dungeon = rng.choice(DUNGEONS)
+        runs.append({"dungeon": dungeon[1], "short_name": "AD", "mythic_level": rng.randint(2, 20),
+                     "completed_at": "2019-10-15T12:00:00.000Z", "clear_time_ms": 1800000,
+                     "num_keystone_upgrades": rng.randint(0, 3), "score": 150.0,
+                     "affixes": [], "url": "https://raider.io"})
+    return {
+        "name": name, "race": "오크", "class": "전사", "active_spec_name": "분노",
+        "active_spec_role": "DPS", "gender": "male", "faction": "horde",
+        "achievement_points": 10000, "honorable_kills": 0,
+        "thumbnail_url": "https://render-kr.worldofwarcraft.com/character/{}.jpg".format(name),
+        "region": "kr", "realm": "Hellscream", "profile_url": "https://raider.io",
+        "profile_banner": "hordebanner1",
+        "gear": {"item_level_equipped": rng.randint(400, 440), "item_level_total": 440,
+                 "artifact_traits": 0, "corruption": {}, "items": {}},
+        "mythic_plus_scores_by_season": [{"season": "season-bfa-3",
+                                          "scores": {"all": rng.randint(0, 3000), "dps": 0,
+                                                     "healer": 0, "tank": 0}}],
+        "mythic_plus_weekly_highest_level_runs": runs,
+    }
+
+
+def guild_members(names, seed):
+    rng = random.Random("guild-{}".format(seed))
+    return {"lastModified": 1571234567000, "name": "길드", "realm": "헬스크림", "members": [{
+        "character": {"name": n, "realm": "헬스크림", "class": rng.randint(1, 12),
+                      "race": rng.randint(1, 10), "gender": 0,
+                      "level": 120 if rng.random() < 0.8 else rng.randint(10, 119),
+                      "achievementPoints": 10000, "thumbnail": "x.jpg",
+                      "lastModified": 1571234567000 + i},
+        "rank": rng.randint(0, 9),
+    } for i, n in enumerate(names)]}
+
+
+def auction_dump(count, seed):
+    rng = random.Random("auction-{}".format(seed))
+    return {"realms": [{"name": "헬스크림", "slug": "hellscream"}], "auctions": [{
+        "auc": i, "item": rng.randint(152000, 153000), "owner": "판매자{}".format(rng.randint(0, 999)),
+        "ownerRealm": "헬스크림", "bid": rng.randint(100, 10 ** 7),
+        "buyout": rng.choice([0, rng.randint(100, 10 ** 8)]),
+        "quantity": rng.randint(1, 200),
+        "timeLeft": rng.choice(["SHORT", "MEDIUM", "LONG", "VERY_LONG"]),
+        "rand": 0, "seed": 0, "context": 0,
+    } for i in range(count)]}
+
+
+def static_indexes():
+    return {
+        "races": {"races": [{"id": i, "name": n} for i, n in RACES]},
+        "realms": {"realms": [{"id": i, "name": n, "slug": s} for i, (n, s) in enumerate(REALMS)]},
+        "classes": {"classes": [{"id": i, "name": n} for i, n in CLASSES]},
+        "dungeons_en": {"dungeons": [{"id": i, "name": en} for i, en, _ in DUNGEONS]},
+        "dungeons_kr": {"dungeons": [{"id": i, "name": kr} for i, _, kr in DUNGEONS]},
+    }
+
+
+AFFIXES = {"region": "kr", "title": "경화, 괴저, 폭군, 수확", "affix_details": [
+    {"id": i, "name": "어픽스{}".format(i), "description": "어픽스 설명 {}".format(i) * 5,
+     "wowhead_url": "https://wowhead.com"} for i in range(4)]}
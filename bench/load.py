@@ -0,0 +1,247 @@
+"""
+여러 사용자가 동시에 명령어를 입력하는 바쁜 디스코드 서버를 흉내 내는 부하 생성기입니다.
+가상 사용자 N명이 정해진 비율로 명령어를 고르고, 조회할 캐릭터는 Zipf 분포로 골라 일부
+캐릭터에 요청이 몰리도록 합니다. 캐시는 비우지 않으므로 실제 운영과 같이 캐시가 찬 상태의
+처리량, 꼬리 응답 시간, 이벤트 루프 지연, 명령어 하나당 API 요청 수(증폭률)를 출력합니다.
+
+저장소 최상위 디렉터리에서 실행합니다.
+
+    python -m bench.load --users 50 --duration 60 --characters 2000 --zipf 1.1
+"""
+import json
+import time
+import bisect
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import resource
+
+from bench.run import Bench, COMMANDS, configure, percentile
+
+
+DEFAULT_MIX = "_character=40,_talent=15,_azeritePower=10,_appearance=10," \
+              "_affixes=10,_token=10,_highest_mythic_plus=5"
+
+
+def parse_mix(value):
+    """'_character=40,_token=10' 형식의 명령어 비율을 (명령어, 비율) 목록으로 바꿉니다."""
+    known = {attr for _, attr, _ in COMMANDS}
+    mix = list()
+    for item in value.split(","):
+        attr, weight = item.split("=")
+        attr = attr.strip()
+        if attr not in known:
+            raise argparse.ArgumentTypeError("알 수 없는 명령어입니다: {}".format(attr))
+        mix.append((attr, float(weight)))
+    return mix
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="명령어 처리 부하 테스트")
+    parser.add_argument("--users", type=int, default=20, help="동시에 명령어를 입력하는 가상 사용자 수")
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=5, help="측정 전에 부하를 거는 시간 (초)")
+    parser.add_argument("--think", type=float, default=1.0,
+                        help="가상 사용자가 명령어 사이에 기다리는 평균 시간 (초, 지수 분포)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help="명령어 비율 (기본값: {})".format(DEFAULT_MIX))
+    parser.add_argument("--characters", type=int, default=1000, help="조회 대상 캐릭터 수")
+    parser.add_argument("--zipf", type=float, default=1.1, help="캐릭터 인기도의 Zipf 지수")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock 서버의 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="응답 지연에 더할 무작위 시간 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500/429로 응답할 비율")
+    parser.add_argument("--roster", type=int, default=100, help="길드원 수")
+    parser.add_argument("--lag-interval", type=float, default=0.05,
+                        help="이벤트 루프 지연을 재는 간격 (초)")
+    parser.add_argument("--port", type=int, default=0,
+                        help="mock 서버 포트 (기본값: 빈 포트, --shared로 여러 번 실행할 때는 고정)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--shared", default=None,
+                        help="프로세스 사이에 공유할 응답 캐시 파일 (기본값: 사용하지 않음)")
+    parser.add_argument("--ratelimits", action="store_true",
+                        help="settings.cfg의 요청 속도 제한을 그대로 적용합니다")
+    parser.add_argument("--loglevel", default="warning")
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 파일 경로")
+    return parser.parse_args(argv)
+
+
+class Zipf:
+    """1위부터 count위까지의 순위를 1/k^s에 비례하는 확률로 고릅니다."""
+    def __init__(self, count, s, rng):
+        self._rng = rng
+        self._cumulative = list()
+        total = 0.0
+        for k in range(1, count + 1):
+            total += 1 / k ** s
+            self._cumulative.append(total)
+
+    def sample(self):
+        target = self._rng.random() * self._cumulative[-1]
+        return bisect.bisect_left(self._cumulative, target)
+
+
+class LoadGenerator:
+    def __init__(self, args, bench):
+        self.args = args
+        self.bench = bench
+        self.rng = random.Random(args.seed)
+        self.characters = Zipf(args.characters, args.zipf, self.rng)
+        self.commands = [attr for attr, _ in args.mix]
+        self.weights = [weight for _, weight in args.mix]
+        self.names = {attr: (name, characters) for name, attr, characters in COMMANDS}
+        self.samples = dict()
+        self.errors = dict()
+        self.lag = list()
+        self.recording = False
+        self.running = True
+
+    def next_command(self):
+        attr = self.rng.choices(self.commands, self.weights)[0]
+        name, characters = self.names[attr]
+        args = tuple("캐릭터{}-헬스크림".format(self.characters.sample()) for _ in range(characters))
+        return attr, name, args
+
+    async def user(self):
+        await asyncio.sleep(self.rng.uniform(0, self.args.think))
+        while self.running:
+            attr, name, args = self.next_command()
+            callback = getattr(self.bench.app, attr).callback
+            elapsed, ok = await self.bench.invoke(name, callback, args)
+            if self.recording:
+                self.samples.setdefault(attr, list()).append(elapsed)
+                if not ok:
+                    self.errors[attr] = self.errors.get(attr, 0) + 1
+            if self.args.think > 0:
+                await asyncio.sleep(self.rng.expovariate(1 / self.args.think))
+
+    async def monitor(self):
+        """정해진 간격으로 잠들었다가 실제로 깨어난 시각이 얼마나 늦었는지 기록합니다."""
+        interval = self.args.lag_interval
+        while self.running:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            if self.recording:
+                self.lag.append(max(0.0, time.perf_counter() - started - interval))
+
+    async def run(self):
+        tasks = [asyncio.ensure_future(self.user()) for _ in range(self.args.users)]
+        tasks.append(asyncio.ensure_future(self.monitor()))
+
+        await asyncio.sleep(self.args.warmup)
+        self.bench.server.reset()
+        snapshot = self.cache_stats()
+        self.recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(self.args.duration)
+        self.recording = False
+        elapsed = time.perf_counter() - started
+        calls = {k: v for k, v in self.bench.server.calls.items() if k != "token"}
+        caches = self.cache_stats(snapshot)
+
+        self.running = False
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return self.summary(elapsed, calls, caches)
+
+    def cache_stats(self, since=None):
+        """응답 캐시와 명령어 캐시의 누적 통계입니다. since가 주어지면 그 이후의 증가량입니다."""
+        stats = dict()
+        for c in self.bench.clients._clients:
+            stats["http:{}".format(c.name)] = dict(c.cache.stats, coalesced=c.stats["coalesced"],
+                                                   not_modified=c.stats["not_modified"])
+        for c in self.bench.command_caches.caches:
+            stats["command:{}".format(c.name)] = dict(c.stats)
+        if since is not None:
+            stats = {name: {k: v - since.get(name, {}).get(k, 0) for k, v in s.items()}
+                     for name, s in stats.items()}
+        return stats
+
+    def summary(self, elapsed, calls, caches):
+        everything = [s for samples in self.samples.values() for s in samples]
+        commands = len(everything)
+        return {
+            "duration": elapsed,
+            "commands": commands,
+            "throughput": commands / elapsed,
+            "errors": sum(self.errors.values()),
+            "latency": {p: percentile(everything, p) for p in (50, 95, 99)},
+            "max_latency": max(everything) if commands > 0 else None,
+            "by_command": {attr: {
+                "commands": len(samples),
+                "errors": self.errors.get(attr, 0),
+                "p50": percentile(samples, 50),
+                "p99": percentile(samples, 99),
+            } for attr, samples in self.samples.items()},
+            "loop_lag": {
+                "p50": percentile(self.lag, 50),
+                "p99": percentile(self.lag, 99),
+                "max": max(self.lag) if len(self.lag) > 0 else None,
+            },
+            "upstream_calls": sum(calls.values()),
+            "amplification": sum(calls.values()) / commands if commands > 0 else None,
+            "upstream_by_route": calls,
+            "caches": caches,
+        }
+
+
+def report(result):
+    def ms(value):
+        return "-" if value is None else "{:.1f}ms".format(value * 1000)
+
+    print("commands: {} in {:.1f}s ({:.1f}/s), errors {}".format(
+        result["commands"], result["duration"], result["throughput"], result["errors"]))
+    print("latency: p50 {}, p95 {}, p99 {}, max {}".format(
+        ms(result["latency"][50]), ms(result["latency"][95]), ms(result["latency"][99]),
+        ms(result["max_latency"])))
+    print("event loop lag: p50 {}, p99 {}, max {}".format(
+        ms(result["loop_lag"]["p50"]), ms(result["loop_lag"]["p99"]), ms(result["loop_lag"]["max"])))
+    print("upstream: {} calls, {:.2f} per command".format(
+        result["upstream_calls"], result["amplification"] or 0))
+    for route, count in sorted(result["upstream_by_route"].items(), key=lambda r: -r[1]):
+        print("  {:<20} {:>8}".format(route, count))
+    for name, stats in sorted(result["caches"].items()):
+        lookups = stats.get("hits", 0) + stats.get("stale_hits", 0) + stats.get("misses", 0)
+        if lookups > 0:
+            print("cache {}: hit rate {:.1%} ({} lookups, {} coalesced)".format(
+                name, (lookups - stats["misses"]) / lookups, lookups, stats.get("coalesced", 0)))
+    print("{:<22} {:>8} {:>6} {:>9} {:>9}".format("command", "count", "errors", "p50", "p99"))
+    for attr, r in sorted(result["by_command"].items()):
+        print("{:<22} {:>8} {:>6} {:>9} {:>9}".format(
+            attr, r["commands"], r["errors"], ms(r["p50"]), ms(r["p99"])))
+
+
+async def main(args):
+    from bench.mock_server import MockServer
+
+    server = MockServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        roster_size=args.roster, seed=args.seed)
+    await server.start(port=args.port)
+    bench = Bench(args, server)
+    try:
+        await bench.setup()
+        result = await LoadGenerator(args, bench).run()
+    finally:
+        await bench.teardown()
+        await server.stop()
+
+    report(result)
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("max RSS: {:.1f} MB".format(max_rss / 1024))
+    if args.json is not None:
+        options = dict(vars(args), mix=dict(args.mix))
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": options, "result": result, "max_rss_kb": max_rss},
+                      f, ensure_ascii=False, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    directory = tempfile.mkdtemp(prefix="wow-load-")
+    try:
+        configure(args, directory)
+        asyncio.get_event_loop().run_until_complete(main(args))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,215 @@
+"""
+blizzard.py, raider.py, warcraftlogs.py가 사용하는 API를 흉내 내는 로컬 aiohttp 서버입니다.
+네트워크 없이 봇의 명령어를 실행해 볼 수 있도록 fixtures의 응답을 돌려주며, 응답 지연과
+오류(500, 429)를 원하는 비율로 섞을 수 있습니다. 경로마다 받은 요청 수를 셉니다.
+"""
+import json
+import time
+import random
+import asyncio
+import hashlib
+from aiohttp import web
+
+from bench import fixtures
+
+
+class MockServer:
+    """
+    Parameters
+    ---
+    latency : 응답마다 기다리는 평균 시간 (초)
+    jitter : 응답 지연에 더해지는 무작위 시간의 최대값 (초)
+    error_rate : 500 또는 429로 응답할 비율 (0 ~ 1)
+    retry_after : 429 응답의 Retry-After 값 (초)
+    roster_size : 길드원 수
+    auctions : 경매장 덤프의 경매 수
+    seed : 응답 데이터와 지연, 오류를 만들 때 사용하는 seed
+    """
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, retry_after=0.1,
+                 roster_size=100, auctions=1000, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.roster = ["길드원{}".format(i) for i in range(roster_size)]
+        self.auctions = auctions
+        self.calls = dict()
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._bodies = dict()
+        self._runner = None
+        self.url = None
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+    def throttle(self, count):
+        """error_rate와 관계없이 다음 count개의 요청(토큰 발급 제외)에 429로 응답합니다."""
+        self.throttled = count
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.add_routes([
+            self._route("/oauth/token", "token", self._token),
+            self._route("/wow/character/{realm}/{name}", "character", self._character),
+            self._route("/profile/wow/character/{realm}/{name}/equipment",
+                        "equipment", self._equipment),
+            self._route("/profile/wow/character/{realm}/{name}/character-media",
+                        "media", self._media),
+            self._route("/wow/guild/{realm}/{guild}", "guild", self._guild),
+            self._route("/wow/auction/data/{realm}", "auction url", self._auction_url),
+            self._route("/auction/dump.json", "auction data", self._auction_dump),
+            self._route("/data/wow/item/{id}", "item", self._item),
+            self._route("/data/wow/playable-race/index", "races", self._static("races")),
+            self._route("/data/wow/realm/index", "realms", self._static("realms")),
+            self._route("/data/wow/playable-class/index", "classes", self._static("classes")),
+            self._route("/data/wow/mythic-keystone/dungeon/index",
+                        "dungeons", self._dungeons),
+            self._route("/data/wow/mythic-keystone/period/index",
+                        "period", self._period_index),
+            self._route("/data/wow/mythic-keystone/period/{id}", "period", self._period),
+            self._route("/data/wow/token/index", "token price", self._token_price),
+            self._route("/raider/mythic-plus/affixes", "raider affixes", self._affixes),
+            self._route("/raider/characters/profile",
+                        "raider character", self._raider_character),
+            self._route("/wcl/class", "wcl classes", self._wcl_classes),
+        ])
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = "http://{}:{}".format(host, port)
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _route(self, path, name, handler):
+        """요청 수를 name으로 세고, 응답 지연과 오류를 섞는 경로를 만듭니다."""
+        async def wrapper(request):
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if name != "token" and self.throttled > 0:
+                self.throttled -= 1
+                return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+            if name != "token" and self._rng.random() < self.error_rate:
+                if self._rng.random() < 0.5:
+                    return web.Response(
+                        status=429, headers={"Retry-After": str(self.retry_after)})
+                return web.Response(status=500)
+            return await handler(request)
+        return web.get(path, wrapper)
+
+    def _json(self, request, key, make):
+        """key마다 한 번만 직렬화한 본문을 ETag와 함께 돌려주고, If-None-Match에는 304로 응답합니다."""
+        if key not in self._bodies:
+            body = json.dumps(make(), ensure_ascii=False).encode("utf-8")
+            self._bodies[key] = (body, '"{}"'.format(hashlib.md5(body).hexdigest()))
+        body, etag = self._bodies[key]
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body, content_type="application/json", headers={"ETag": etag})
+
+    @staticmethod
+    def _exists(name):
+        return not name.startswith("없는")
+
+    async def _token(self, request):
+        return web.json_response({"access_token": "mock-token", "token_type": "bearer",
+                                  "expires_in": 86399})
+
+    async def _character(self, request):
+        name = request.match_info["name"]
+        if not self._exists(name):
+            return web.json_response({"status": "nok", "reason": "Character not found."}, status=404)
+        if request.query.get("fields") == "talents":
+            return self._json(request, ("talents", name),
+                              lambda: fixtures.character_talents(name, self.seed))
+        return self._json(request, ("character", name),
+                          lambda: fixtures.character(name, self.seed))
+
+    async def _equipment(self, request):
+        name = request.match_info["name"]
+        if not self._exists(name):
+            return web.json_response({"code": 404}, status=404)
+        return self._json(request, ("equipment", name),
+                          lambda: fixtures.character_items(name, self.seed))
+
+    async def _media(self, request):
+        name = request.match_info["name"]
+        if not self._exists(name):
+            return web.json_response({"code": 404}, status=404)
+        return self._json(request, ("media", name),
+                          lambda: fixtures.character_media(name, self.seed))
+
+    async def _guild(self, request):
+        return self._json(request, ("guild",),
+                          lambda: fixtures.guild_members(self.roster, self.seed))
+
+    async def _auction_url(self, request):
+        return web.json_response({"files": [{
+            "url": "{}/auction/dump.json".format(self.url),
+            "lastModified": 1571234567000,
+        }]})
+
+    async def _auction_dump(self, request):
+        return self._json(request, ("auction",),
+                          lambda: fixtures.auction_dump(self.auctions, self.seed))
+
+    async def _item(self, request):
+        item_id = int(request.match_info["id"])
+        return self._json(request, ("item", item_id), lambda: {
+            "id": item_id, "name": "아이템 {}".format(item_id),
+            "quality": {"type": "EPIC", "name": "영웅"}, "level": 420,
+            "item_class": {"name": "소비용품", "id": 0}})
+
+    def _static(self, key):
+        async def handler(request):
+            return self._json(request, (key,), lambda: fixtures.static_indexes()[key])
+        return handler
+
+    async def _dungeons(self, request):
+        key = "dungeons_en" if request.query.get("locale") == "en_US" else "dungeons_kr"
+        return self._json(request, (key,), lambda: fixtures.static_indexes()[key])
+
+    async def _period_index(self, request):
+        return web.json_response({"current_period": {"id": 700}})
+
+    async def _period(self, request):
+        now = int(time.time() * 1000)
+        return web.json_response({"id": int(request.match_info["id"]),
+                                  "start_timestamp": now - 3 * 86400000,
+                                  "end_timestamp": now + 4 * 86400000})
+
+    async def _token_price(self, request):
+        return web.json_response({"last_updated_timestamp": int(time.time() * 1000),
+                                  "price": 2345670000})
+
+    async def _affixes(self, request):
+        return self._json(request, ("affixes",), lambda: fixtures.AFFIXES)
+
+    async def _raider_character(self, request):
+        name = request.query.get("name", "")
+        if not self._exists(name):
+            return web.json_response({"statusCode": 400, "message": "Could not find requested character"},
+                                     status=400)
+        return self._json(request, ("raider", name),
+                          lambda: fixtures.raider_character(name, self.seed))
+
+    async def _wcl_classes(self, request):
+        return self._json(request, ("wcl",), lambda: [
+            {"id": i, "name": n, "specs": [{"id": j, "name": s}
+                                           for j, s in enumerate(fixtures.CLASS_SPECS[i], 1)]}
+            for i, n in fixtures.CLASSES])
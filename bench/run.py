@@ -0,0 +1,339 @@
+"""
+로컬 mock 서버를 upstream으로 사용해 bot.py의 명령어들을 실행하고, 명령어마다 응답 시간
+(p50/p95/p99), 명령어 하나당 upstream 요청 수, 최대 메모리 사용량을 출력합니다.
+네트워크를 사용하지 않으므로 변경 전후의 결과를 같은 조건에서 비교할 수 있습니다.
+
+저장소 최상위 디렉터리에서 실행합니다.
+
+    python -m bench.run --iterations 100 --latency 0.05 --error-rate 0.01
+"""
+import os
+import gc
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import resource
+import tracemalloc
+
+import config
+
+
+# (명령어 이름, bot 모듈의 함수 이름, 한 번에 조회하는 캐릭터 수)
+COMMANDS = [
+    ("캐릭터", "_character", 1),
+    ("비교", "_compare", 10),
+    ("아제특성", "_azeritePower", 1),
+    ("외형", "_appearance", 1),
+    ("특성", "_talent", 1),
+    ("어픽스", "_affixes", 0),
+    ("토큰", "_token", 0),
+    ("주차", "_highest_mythic_plus", 0),
+]
+
+
+class FakeMessage:
+    async def edit(self, **kwargs):
+        pass
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class FakeContext:
+    """명령어가 보낸 embed를 채널에 보내지 않고 기록해 두는 Context입니다."""
+    def __init__(self, name):
+        self.command_name = name
+        self.sent = list()
+        self.guild = None
+        self.author = None
+
+    async def trigger_typing(self):
+        pass
+
+    async def send(self, content=None, embed=None, **kwargs):
+        self.sent.append(embed)
+        return FakeMessage()
+
+
+def percentile(values, p):
+    if len(values) == 0:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values) + 0.5)) - 1))]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="명령어 처리 오프라인 벤치마크")
+    parser.add_argument("--iterations", type=int, default=50, help="명령어마다 실행할 횟수")
+    parser.add_argument("--characters", type=int, default=20, help="번갈아 조회할 캐릭터 수")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock 서버의 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="응답 지연에 더할 무작위 시간 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500/429로 응답할 비율")
+    parser.add_argument("--roster", type=int, default=100, help="길드원 수")
+    parser.add_argument("--port", type=int, default=0,
+                        help="mock 서버 포트 (기본값: 빈 포트, --shared로 여러 번 실행할 때는 고정)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm", action="store_true",
+                        help="실행 사이에 응답 캐시와 명령어 캐시를 비우지 않습니다")
+    parser.add_argument("--shared", default=None,
+                        help="프로세스 사이에 공유할 응답 캐시 파일 (기본값: 사용하지 않음)")
+    parser.add_argument("--ratelimits", action="store_true",
+                        help="settings.cfg의 요청 속도 제한을 그대로 적용합니다")
+    parser.add_argument("--commands", nargs="*", default=None,
+                        help="실행할 명령어 (기본값: 전체)")
+    parser.add_argument("--decoder", default="auto", choices=["auto", "orjson", "json"],
+                        help="API 응답을 해석할 JSON 라이브러리")
+    parser.add_argument("--footprint", type=int, default=50,
+                        help="캐시 메모리를 잴 때 조회할 캐릭터 수 (0이면 재지 않음)")
+    parser.add_argument("--loglevel", default="warning")
+    parser.add_argument("--json", default=None, help="결과를 저장할 JSON 파일 경로")
+    return parser.parse_args(argv)
+
+
+def configure(args, directory):
+    """bot을 import하기 전에 설정을 덮어써 저장 파일이 임시 디렉터리에 만들어지도록 합니다."""
+    overrides = {
+        "logger_loglevel": args.loglevel,
+        "item_store": os.path.join(directory, "items.db"),
+        "auction_history": os.path.join(directory, "auction_history.bin"),
+        "static_path": os.path.join(directory, "static_data.json"),
+        "metrics_port": "",
+        "cache_shared": args.shared or "",
+        "http_json_decoder": getattr(args, "decoder", "auto"),
+        "shard_workers": "1",
+        "blizzard_id": "bench",
+        "blizzard_secret": "bench",
+        "warcraftlogs_token": "bench",
+    }
+    if not args.ratelimits:
+        for upstream in ["blizzard", "raider", "warcraftlogs"]:
+            overrides["ratelimit_{}_rate".format(upstream)] = "1000000"
+            overrides["ratelimit_{}_burst".format(upstream)] = "1000000"
+        overrides["ratelimit_blizzard_hourly"] = "1000000000"
+    config._CONFIG_DATA.update(overrides)
+
+
+class Bench:
+    def __init__(self, args, server):
+        import bot
+        import tracing
+        import static_data
+        from client import HttpClient
+        from decorators import CommandCache
+        from params import COLOR
+
+        self.args = args
+        self.server = server
+        self.app = bot
+        self.tracing = tracing
+        self.static_data = static_data
+        self.clients = HttpClient
+        self.command_caches = CommandCache
+        self.red = COLOR.RED
+
+    async def setup(self):
+        from blizzard import Blizzard
+        from raider import Raider
+        from warcraftlogs import Warcraftlogs
+
+        Blizzard.BASE = self.server.url
+        Blizzard.token._url = "{}/oauth/token".format(self.server.url)
+        Raider.BASE = "{}/raider".format(self.server.url)
+        Warcraftlogs.BASE = "{}/wcl".format(self.server.url)
+
+        await self.clients.start_all()
+        await Blizzard.token.start()
+        self.static_data.apply(await self.static_data.fetch())
+        await self.app.roster.update()
+
+    async def teardown(self):
+        from blizzard import Blizzard
+        await Blizzard.token.stop()
+        await self.clients.close_all()
+        Blizzard.item_info.close()
+        self.app.price_history.close()
+
+    def decoding(self):
+        """엔드포인트별 JSON 해석 횟수, 평균 시간(초), 평균 본문 크기(바이트)입니다."""
+        result = dict()
+        for c in self.clients._clients:
+            for endpoint, (count, seconds, size) in c.decoding.items():
+                result["{} {}".format(c.name, endpoint)] = {
+                    "count": count, "seconds": seconds / count, "bytes": size / count}
+        return result
+
+    def clear_caches(self):
+        for c in self.clients._clients:
+            c.cache.clear()
+        for c in self.command_caches.caches:
+            c.entries.clear()
+
+    def expire_caches(self):
+        """응답 캐시의 항목을 지우지 않고 만료시켜 다음 요청이 조건부 요청(304)이 되도록 합니다."""
+        for c in self.clients._clients:
+            for entry in c.cache._entries.values():
+                entry.expires_at = 0
+        for c in self.command_caches.caches:
+            c.entries.clear()
+
+    def responses(self, status):
+        return sum(c.responses.get(status, 0) for c in self.clients._clients)
+
+    def arguments(self, characters, i):
+        return tuple("캐릭터{}-헬스크림".format((i + j) % self.args.characters)
+                     for j in range(characters))
+
+    async def invoke(self, name, callback, args):
+        """명령어를 한 번 실행하고 (걸린 시간, 성공 여부)를 리턴합니다."""
+        ctx = FakeContext(name)
+        token = self.tracing.current_command.set(name)
+        started = time.perf_counter()
+        try:
+            await callback(ctx, *args)
+            ok = len(ctx.sent) > 0 and all(
+                e is not None and getattr(e.colour, "value", None) != self.red for e in ctx.sent)
+        except Exception:
+            ok = False
+        finally:
+            self.tracing.current_command.reset(token)
+        return time.perf_counter() - started, ok
+
+    async def cache_footprint(self, count):
+        """
+        캐릭터 count명의 모든 리소스를 불러와 응답 캐시를 채운 뒤, 캐시를 비웠을 때 줄어드는
+        메모리와 캐시가 max_bytes에 계산한 크기를 캐릭터당 바이트로 리턴합니다.
+        """
+        from loader import CharacterLoader
+
+        self.clear_caches()
+        gc.collect()
+        tracemalloc.start()
+        for i in range(count):
+            await CharacterLoader("헬스크림", "캐릭터{}".format(i)).load(
+                *CharacterLoader.RESOURCES)
+        gc.collect()
+        filled = tracemalloc.get_traced_memory()[0]
+        charged = sum(c.cache.size for c in self.clients._clients)
+        self.clear_caches()
+        gc.collect()
+        empty = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return (filled - empty) / count, charged / count
+
+    async def run_command(self, name, attr, characters):
+        callback = getattr(self.app, attr).callback
+        self.clear_caches()
+        self.server.reset()
+
+        samples, errors = list(), 0
+        for i in range(self.args.iterations):
+            if not self.args.warm:
+                self.clear_caches()
+            elapsed, ok = await self.invoke(name, callback, self.arguments(characters, i))
+            samples.append(elapsed)
+            errors += 0 if ok else 1
+        calls = {k: v for k, v in self.server.calls.items() if k != "token"}
+
+        # 메모리는 tracemalloc 때문에 느려지므로 응답 시간과 따로 잽니다.
+        self.clear_caches()
+        tracemalloc.start()
+        for i in range(min(self.args.iterations, 10)):
+            await self.invoke(name, callback, self.arguments(characters, i))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        # 본문이 없는 응답을 처리하는 경로를 확인합니다. 캐시를 만료시킨 뒤 다시 실행해
+        # 304를 받고, 캐시를 비운 뒤 첫 요청에 429를 받아 Retry-After 후 재시도합니다.
+        not_modified, throttled = self.responses(304), self.responses(429)
+        path_errors = 0
+        for prepare in [self.expire_caches, lambda: (self.clear_caches(), self.server.throttle(1))]:
+            prepare()
+            _, ok = await self.invoke(name, callback, self.arguments(characters, 0))
+            path_errors += 0 if ok else 1
+        self.server.throttle(0)
+
+        return {
+            "command": attr,
+            "name": name,
+            "iterations": self.args.iterations,
+            "errors": errors,
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "upstream_calls": sum(calls.values()) / self.args.iterations,
+            "upstream_by_route": calls,
+            "peak_bytes": peak,
+            "not_modified": self.responses(304) - not_modified,
+            "throttled": self.responses(429) - throttled,
+            "path_errors": path_errors,
+        }
+
+
+def report(results):
+    print("{:<22} {:>6} {:>6} {:>9} {:>9} {:>9} {:>9} {:>10} {:>5} {:>5} {:>11}".format(
+        "command", "runs", "errors", "p50(ms)", "p95(ms)", "p99(ms)", "calls", "peak(KB)",
+        "304", "429", "path errors"))
+    for r in results:
+        print("{:<22} {:>6} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.2f} {:>10.0f} {:>5} {:>5} {:>11}".format(
+            r["command"], r["iterations"], r["errors"], r["p50"] * 1000, r["p95"] * 1000,
+            r["p99"] * 1000, r["upstream_calls"], r["peak_bytes"] / 1024,
+            r["not_modified"], r["throttled"], r["path_errors"]))
+
+
+async def main(args):
+    from bench.mock_server import MockServer
+
+    server = MockServer(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        roster_size=args.roster, seed=args.seed)
+    await server.start(port=args.port)
+    bench = Bench(args, server)
+    try:
+        await bench.setup()
+        results = list()
+        for name, attr, characters in COMMANDS:
+            if args.commands and name not in args.commands and attr not in args.commands:
+                continue
+            results.append(await bench.run_command(name, attr, characters))
+        decoding = bench.decoding()
+        footprint = None
+        if args.footprint > 0:
+            footprint = await bench.cache_footprint(args.footprint)
+    finally:
+        await bench.teardown()
+        await server.stop()
+
+    report(results)
+    import decoder
+    print("JSON decoder: {}".format(decoder.name))
+    print("{:<40} {:>8} {:>12} {:>10} {:>9}".format("endpoint", "count", "decode(us)", "size(KB)", "MB/s"))
+    for endpoint, d in sorted(decoding.items(), key=lambda d: -d[1]["seconds"]):
+        print("{:<40} {:>8} {:>12.1f} {:>10.1f} {:>9.1f}".format(
+            endpoint, d["count"], d["seconds"] * 1e6, d["bytes"] / 1024,
+            d["bytes"] / d["seconds"] / 1024 / 1024 if d["seconds"] > 0 else 0))
+    if footprint is not None:
+        print("response cache per character: {:.1f} KB (charged to max_bytes: {:.1f} KB)".format(
+            footprint[0] / 1024, footprint[1] / 1024))
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("max RSS: {:.1f} MB".format(max_rss / 1024))
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results, "max_rss_kb": max_rss,
+                       "decoder": decoder.name, "decoding": decoding,
+                       "cache_bytes_per_character": None if footprint is None else footprint[0],
+                       "cache_charged_bytes_per_character": None if footprint is None else footprint[1]},
+                      f, ensure_ascii=False, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    directory = tempfile.mkdtemp(prefix="wow-bench-")
+    try:
+        configure(args, directory)
+        asyncio.get_event_loop().run_until_complete(main(args))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -3,6 +3,12 @@ import aiohttp
 from datetime import datetime, timedelta
 
 from utils import encode
+from client import HttpClient
+from oauth import TokenManager
+from items import ItemStore
+from models import CharacterProfile, CharacterTalents, CharacterMedia, Equipment
+from fanout import fan_out
+import auction
 import logger
 import config
 from params import *
@@ -12,329 +18,215 @@ class Blizzard:
     BASE = "https://kr.api.blizzard.com"
     OAUTH_BASE = "https://kr.battle.net/oauth"
     THUMBNAIL_BASE = "https://render-kr.worldofwarcraft.com/character"
-    _token = None
-
-    item_info = dict()
-
-    @classmethod
-    async def change_access_token(cls):
-        query = "?grant_type=client_credentials&client_id={}&client_secret={}".format(
-            config.get("blizzard_id"), config.get("blizzard_secret"))
-        url = encode("{}/token".format(cls.OAUTH_BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    token = await response.json()
-                    if cls._token != token["access_token"]:
-                        cls._token = token["access_token"]
-                        logger.info("Changed the access token for Blizzard API.")
-                        return True
-                else:
-                    logger.error("Failed to change the access token for Blizzard API.")
-            return False
-
-    @classmethod
-    async def check_access_token(cls):
-        query = "?token={}".format(cls._token)
-        url = encode("{}/check_token".format(cls.OAUTH_BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 400:
-                    await cls.change_access_token()
-                    return True
-                elif response.status == 200:
-                    return True
-        return False
-
-    @classmethod
-    async def get_character(cls, realm_name, character_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&fields=items,stats,guild,progression&locale=ko_KR"
+    _client = HttpClient(
+        "blizzard",
+        rate=float(config.get("ratelimit_blizzard_rate")),
+        burst=int(config.get("ratelimit_blizzard_burst")),
+        hourly=int(config.get("ratelimit_blizzard_hourly")))
+    token = TokenManager(
+        _client, "{}/token".format(OAUTH_BASE),
+        config.get("blizzard_id"), config.get("blizzard_secret"))
+
+    # 파일은 처음 사용할 때 열리므로 import만으로는 만들어지지 않습니다.
+    item_info = ItemStore(
+        config.get("item_store", "items.db"),
+        max_hot=int(config.get("item_max_hot", 10000)),
+        retry_after=int(config.get("item_retry_after", 24 * 60 * 60)))
+
+    @classmethod
+    async def _get(cls, url, description, ttl=None, model=None, revisited=False):
+        token = await cls.token.get()
+        headers = {"Authorization": "Bearer {}".format(token)}
+
+        status, data = await cls._client.get_json(
+            url, headers=headers, ttl=ttl, endpoint=description, model=model)
+        if status == 200:
+            return data
+        else:
+            if status == 401 and not revisited:
+                cls.token.invalidate(token)
+                return await cls._get(url, description, ttl=ttl, model=model, revisited=True)
+            logger.error("Failed to get {} from blizzard.", description)
+            return None
+
+    @classmethod
+    async def get_character(cls, realm_name, character_name):
+        query = "?fields=items,stats,guild,progression&locale=ko_KR"
         url = encode("{}/wow/character/{}/{}".format(
-            cls.BASE, REALM.EN(realm_name), character_name), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_character(
-                            realm_name, character_name, revisited=True)
-                    logger.error("Failed to get character from blizzard.")
-                    return None
+            cls.BASE, REALM.EN(realm_name), character_name.lower()), query)
+        return await cls._get(url, "character", ttl=300, model=CharacterProfile)
 
     @classmethod
-    async def get_character_talents(cls, realm_name, character_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&fields=talents&locale=ko_KR"
+    async def get_character_talents(cls, realm_name, character_name):
+        query = "?fields=talents&locale=ko_KR"
         url = encode("{}/wow/character/{}/{}".format(
-            cls.BASE, REALM.EN(realm_name), character_name), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_character_talents(
-                            realm_name, character_name, revisited=True)
-                    logger.error("Failed to get talents of character from blizzard.")
-                    return None
+            cls.BASE, REALM.EN(realm_name), character_name.lower()), query)
+        return await cls._get(url, "talents of character", ttl=600, model=CharacterTalents)
 
     @classmethod
-    async def get_character_media(cls, realm_name, character_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=profile-kr&locale=ko_KR"
+    async def get_character_media(cls, realm_name, character_name):
+        query = "?namespace=profile-kr&locale=ko_KR"
         url = encode("{}/profile/wow/character/{}/{}/character-media".format(
             cls.BASE, REALM.EN(realm_name), character_name.lower()), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_character_media(
-                            realm_name, character_name, revisited=True)
-                    logger.error("Failed to get media of character from blizzard.")
-                    return None
+        return await cls._get(url, "media of character", ttl=3600, model=CharacterMedia)
 
     @classmethod
-    async def get_character_items(cls, realm_name, character_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=profile-kr&locale=ko_KR"
+    async def get_character_items(cls, realm_name, character_name):
+        query = "?namespace=profile-kr&locale=ko_KR"
         url = encode("{}/profile/wow/character/{}/{}/equipment".format(
             cls.BASE, REALM.EN(realm_name), character_name.lower()), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_character_items(
-                            realm_name, character_name, revisited=True)
-                    logger.error("Failed to get equipped items of character from blizzard.")
-                    return None
+        return await cls._get(url, "equipped items of character", ttl=300, model=Equipment)
 
     @classmethod
-    async def get_auction_url(cls, realm_name, revisited=False):
-        query = "?access_token={}&locale=ko_KR".format(cls._token)
+    async def get_auction_url(cls, realm_name):
+        query = "?locale=ko_KR"
         url = encode("{}/wow/auction/data/{}".format(cls.BASE, realm_name), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_auction_url(realm_name, revisited=True)
-                    logger.error("Failed to get auction url from blizzard.")
-                    return None
-
-    @classmethod
-    async def get_auction_data(cls, url, revisited=False):
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_auction_data(url, revisited=True)
-                    logger.error("Failed to get auction data from blizzard.")
-                    return None
-
-    @classmethod
-    async def get_item(cls, item_id, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "namespace=static-kr&locale=ko_KR"
+        return await cls._get(url, "auction url")
+
+    @classmethod
+    async def get_auction_data(cls, url, sink):
+        """
+        경매장 덤프를 스트리밍으로 내려받아 경매 레코드를 하나씩 sink로 넘깁니다.
+        전체 JSON을 메모리에 올리지 않으며, 처리 통계를 리턴합니다.
+        덤프는 수 MB라 전체 시간 제한(http_timeout) 대신 읽기 사이의 시간만 제한합니다.
+        """
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=int(config.get("http_timeout", 10)),
+            sock_read=int(config.get("auction_read_timeout", 60)))
+        async with cls._client.stream(url, endpoint="auction data", timeout=timeout) as response:
+            if response.status == 200:
+                return await auction.ingest(response, sink)
+            else:
+                logger.error("Failed to get auction data from blizzard.")
+                return None
+
+    @classmethod
+    async def get_auction_snapshot(cls, realm_name, last_modified=None):
+        """
+        서버의 최신 경매장 덤프를 받아 열 단위 스냅샷으로 만듭니다.
+        덤프가 last_modified 이후로 바뀌지 않았다면 내려받지 않고 None을 리턴합니다.
+        """
+        res = await cls.get_auction_url(REALM.EN(realm_name))
+        if res is None or len(res["files"]) == 0:
+            return None
+        dump = res["files"][0]
+        if dump["lastModified"] == last_modified:
+            return None
+
+        snapshot = auction.AuctionSnapshot(realm_name, dump["lastModified"])
+        stats = await cls.get_auction_data(dump["url"], snapshot.append)
+        if stats is None:
+            return None
+        await asyncio.get_event_loop().run_in_executor(None, snapshot.build_index)
+        snapshot.stats = stats
+        return snapshot
+
+    @classmethod
+    async def get_item(cls, item_id):
+        query = "?namespace=static-kr&locale=ko_KR"
         url = encode("{}/data/wow/item/{}".format(cls.BASE, item_id), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_item(item_id, revisited=True)
-                    logger.error("Failed to get item from blizzard.")
-                    return None
-
-    @classmethod
-    async def get_races(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=static-kr&locale=ko_KR"
+        return await cls._get(url, "item")
+
+    @classmethod
+    async def get_item_info(cls, item_id):
+        """아이템 정보를 로컬 저장소에서 찾고, 없으면 API에서 받아와 저장합니다."""
+        item = cls.item_info.get(item_id)
+        if item is None:
+            res = await cls.get_item(item_id)
+            if res is not None:
+                cls.item_info.put_many([res])
+                item = cls.item_info.get(item_id)
+        return item
+
+    @classmethod
+    async def prefetch_items(cls, item_ids, concurrency=8, limit=500):
+        """
+        로컬 저장소에 없는 아이템 정보를 동시에 최대 concurrency개씩 받아와 한 번에 저장합니다.
+        한 번에 최대 limit개까지만 받아오며, 나머지는 다음 경매장 갱신 때 이어서 받습니다.
+        일부 아이템을 받지 못해도 받은 아이템은 저장하며, 받지 못한 아이템은 한동안 다시
+        요청하지 않습니다. 저장소 조회와 저장은 executor에서 실행합니다.
+        """
+        loop = asyncio.get_event_loop()
+        missing = await loop.run_in_executor(None, cls.item_info.missing, list(item_ids))
+        if len(missing) == 0:
+            return 0
+        if len(missing) > limit:
+            logger.info("Prefetching {} of {} missing items.", limit, len(missing))
+            missing = missing[:limit]
+
+        res = await fan_out(
+            missing, cls.get_item, concurrency=concurrency, name="Item prefetch")
+        cls.item_info.mark_failed([i for i, r in zip(missing, res.results) if r is None])
+        items = list(res)
+        await loop.run_in_executor(None, cls.item_info.put_many, items)
+        return len(items)
+
+    @classmethod
+    async def get_races(cls):
+        query = "?namespace=static-kr&locale=ko_KR"
         url = encode("{}/data/wow/playable-race/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_races(revisited=True)
-                    logger.error("Failed to get races from blizzard.")
-                    return None
+        return await cls._get(url, "races", ttl=86400)
 
     @classmethod
-    async def get_realms(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=dynamic-kr&locale=ko_KR"
+    async def get_realms(cls):
+        query = "?namespace=dynamic-kr&locale=ko_KR"
         url = encode("{}/data/wow/realm/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_realms(revisited=True)
-                    logger.error("Failed to get realms from blizzard.")
-                    return None
+        return await cls._get(url, "realms", ttl=86400)
 
     @classmethod
-    async def get_classes(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=static-kr&locale=ko_KR"
+    async def get_classes(cls):
+        query = "?namespace=static-kr&locale=ko_KR"
         url = encode("{}/data/wow/playable-class/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_classes(revisited=True)
-                    logger.error("Failed to get classes from blizzard.")
-                    return None
+        return await cls._get(url, "classes", ttl=86400)
 
     @classmethod
-    async def get_dungeons_kr(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=dynamic-kr&locale=ko_KR"
+    async def get_dungeons_kr(cls):
+        query = "?namespace=dynamic-kr&locale=ko_KR"
         url = encode("{}/data/wow/mythic-keystone/dungeon/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_dungeons_kr(revisited=True)
-                    logger.error("Failed to get dungeons from blizzard.")
-                    return None
+        return await cls._get(url, "dungeons", ttl=86400)
 
     @classmethod
-    async def get_dungeons_en(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=dynamic-kr&locale=en_US"
+    async def get_dungeons_en(cls):
+        query = "?namespace=dynamic-kr&locale=en_US"
         url = encode("{}/data/wow/mythic-keystone/dungeon/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_dungeons_en(revisited=True)
-                    logger.error("Failed to get dungeons from blizzard.")
-                    return None
+        return await cls._get(url, "dungeons", ttl=86400)
 
     @classmethod
-    async def get_mythic_keystone_period(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=dynamic-kr&locale=ko_KR"
+    async def get_mythic_keystone_period(cls):
+        query = "?namespace=dynamic-kr&locale=ko_KR"
         url = encode("{}/data/wow/mythic-keystone/period/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    period = await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        period = await cls.get_mythic_keystone_period(revisited=True)
-                    logger.error("Failed to get mythic keystone period from blizzard.")
-                    return None
+        period = await cls._get(url, "mythic keystone period")
+        if period is None:
+            return None
 
         url = encode("{}/data/wow/mythic-keystone/period/{}".format(
             cls.BASE, period["current_period"]["id"]), query)
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_mythic_keystone_period(revisited=True)
-                    logger.error("Failed to get mythic keystone period from blizzard.")
-                    return None
+        return await cls._get(url, "mythic keystone period")
 
     @classmethod
-    async def get_token_price(cls, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&namespace=dynamic-kr&locale=ko_KR"
+    async def get_token_price(cls):
+        query = "?namespace=dynamic-kr&locale=ko_KR"
         url = encode("{}/data/wow/token/index".format(cls.BASE), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_token_price(revisited=True)
-                    logger.error("Failed to get token price from blizzard.")
-                    return None
+        return await cls._get(url, "token price")
 
     @classmethod
-    async def get_guild_news(cls, realm_name, guild_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&locale=ko_KR&fields=news"
+    async def get_guild_news(cls, realm_name, guild_name):
+        query = "?locale=ko_KR&fields=news"
         url = encode("{}/wow/guild/{}/{}".format(
             cls.BASE, realm_name, guild_name), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_guild_news(realm_name, guild_name, revisited=True)
-                    logger.error("Failed to get guild news from blizzard.")
-                    return None
+        return await cls._get(url, "guild news")
 
     @classmethod
-    async def get_equippable_item(cls, item_id, bonus_lists, revisited=False):
+    async def get_equippable_item(cls, item_id, bonus_lists):
         bonus_lists = [str(bl) for bl in bonus_lists]
-        query = "?access_token={}".format(cls._token) \
-                + "&locale=ko_KR&bl={}".format(",".join(bonus_lists))
+        query = "?locale=ko_KR&bl={}".format(",".join(bonus_lists))
         url = encode("{}/wow/item/{}".format(cls.BASE, item_id), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_equippable_item(item_id, bonus_lists, revisited=True)
-                    logger.error("Failed to get equippable item from blizzard.")
-                    return None
+        return await cls._get(url, "equippable item")
 
     @classmethod
-    async def get_guild_members(cls, realm_name, guild_name, revisited=False):
-        query = "?access_token={}".format(cls._token) \
-                + "&locale=ko_KR&fields=members"
+    async def get_guild_members(cls, realm_name, guild_name):
+        query = "?locale=ko_KR&fields=members"
         url = encode("{}/wow/guild/{}/{}".format(
             cls.BASE, realm_name, guild_name), query)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    if not revisited and await cls.check_access_token():
-                        return await cls.get_guild_members(realm_name, guild_name, revisited=True)
-                    logger.error("Failed to get guild members from blizzard.")
-                    return None
+        return await cls._get(url, "guild members")
@@ -1,5 +1,6 @@
 import re
 import sys
+import time
 import asyncio
 from datetime import datetime, timedelta
 import discord
@@ -8,48 +9,178 @@ from discord.ext import commands, tasks
 import utils
 import config
 import logger
+import metrics
+import tracing
+import ratelimit
+import static_data
 from params import *
 from raider import Raider
 from blizzard import Blizzard
 from warcraftlogs import Warcraftlogs
+from client import HttpClient
+from auction import AuctionHouse
+from history import PriceHistory, DAY
+from roster import RosterTracker
+from loader import CharacterLoader
+from fanout import fan_out
 from decorators import *
 
 
-bot = commands.Bot(command_prefix=config.get("command_prefix"))
-
+class WowBot(commands.AutoShardedBot):
+    """
+    샤드를 자동으로 나누어 실행하는 봇입니다. 설정에 샤드 번호가 없으면 한 프로세스에서
+    Discord가 권장하는 수만큼의 샤드를 모두 실행하며, launcher.py는 샤드를 여러 워커
+    프로세스에 나누어 shard_ids와 shard_count를 설정합니다.
+    주 워커(primary)만 경매장 기록과 아이템 정보를 저장하고, 길드원 현황은 길드 채널이
+    속한 샤드를 실행하는 워커만 갱신합니다.
+    """
+    metrics_server = None
+
+    @property
+    def primary(self):
+        return config.get("shard_primary", "true") == "true"
+
+    def owns(self, guild_id):
+        """guild_id 서버가 이 프로세스에서 실행하는 샤드에 속하는지 확인합니다."""
+        if self.shard_ids is None or self.shard_count is None:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    async def start(self, *args, **kwargs):
+        await HttpClient.start_all()
+        await Blizzard.token.start()
+        if config.get("metrics_port", "") != "":
+            self.metrics_server = metrics.MetricsServer(
+                config.get("metrics_host", "127.0.0.1"), int(config.get("metrics_port")))
+            await self.metrics_server.start()
+        await super().start(*args, **kwargs)
+
+    async def close(self):
+        await super().close()
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        await Blizzard.token.stop()
+        await HttpClient.close_all()
+
+
+def _shard_options():
+    options = dict()
+    if config.get("shard_count", "") != "":
+        options["shard_count"] = int(config.get("shard_count"))
+    if config.get("shard_ids", "") != "":
+        options["shard_ids"] = [int(i) for i in config.get("shard_ids").split(",")]
+    return options
+
+
+bot = WowBot(command_prefix=config.get("command_prefix"), **_shard_options())
+price_history = PriceHistory(config.get("auction_history", "auction_history.bin"))
+static_path = config.get("static_path", "static_data.json")
+static_updated = static_data.load(static_path)
+# 서버 목록 등 정적 데이터를 한 번이라도 불러왔는지 여부입니다.
+static_ready = asyncio.Event()
+if static_updated is not None:
+    static_ready.set()
+roster = RosterTracker(
+    config.get("default_realm"), config.get("default_guild"),
+    max_age=int(config.get("guild_max_age", 3600)))
+
+
+@tasks.loop(hours=1)
+@background_task("static data update")
+async def update_static_data():
+    global static_updated
+    interval = int(config.get("static_interval", 24)) * 60 * 60
+    if static_updated is not None and time.time() - static_updated < interval:
+        return
+    # 다른 워커 프로세스가 이미 새로 받아 저장했다면 그 파일을 읽습니다.
+    updated = static_data.load(static_path)
+    if updated is not None and time.time() - updated < interval:
+        static_updated = updated
+        static_ready.set()
+        return
+    ratelimit.set_priority(ratelimit.BACKGROUND)
+    if await static_data.refresh(static_path):
+        static_updated = time.time()
+        static_ready.set()
 
-async def init_params():
-    races = await Blizzard.get_races()
-    for i in races["races"]:
-        RACE._races[i["id"]] = i["name"]
 
-    realms = await Blizzard.get_realms()
-    for i in realms["realms"]:
-        REALM._realms[i["name"]] = i["slug"]
+@tasks.loop(minutes=int(config.get("auction_interval", 60)))
+@background_task("auction update")
+async def update_auctions():
+    ratelimit.set_priority(ratelimit.BACKGROUND)
+    realm_name = config.get("default_realm")
+    if not REALM.exists(realm_name):
+        return
+    previous = AuctionHouse.get(realm_name)
+    snapshot = await Blizzard.get_auction_snapshot(
+        realm_name, None if previous is None else previous.last_modified)
+    if snapshot is not None:
+        AuctionHouse.set(realm_name, snapshot)
+        loop = asyncio.get_event_loop()
+        if not bot.primary:
+            await loop.run_in_executor(None, price_history.reload)
+            return
+        # 아이템 정보를 받지 못해도 이번 시간의 기록은 남도록 기록을 먼저 저장합니다.
+        await loop.run_in_executor(
+            None, price_history.append, snapshot.last_modified / 1000, snapshot)
+        await loop.run_in_executor(
+            None, price_history.compact,
+            time.time() - int(config.get("auction_hourly_days", 7)) * DAY)
+        await Blizzard.prefetch_items(
+            snapshot.items(),
+            concurrency=int(config.get("item_prefetch_concurrency", 8)),
+            limit=int(config.get("item_prefetch_limit", 500)))
+
+
+@tasks.loop(minutes=int(config.get("guild_interval", 10)))
+@background_task("roster update")
+async def update_roster():
+    ratelimit.set_priority(ratelimit.BACKGROUND)
+    if not REALM.exists(roster.realm_name) or not bot.owns(int(config.get("guild_channel", 0))):
+        return
+    await roster.update(
+        concurrency=int(config.get("guild_scan_concurrency", 8)),
+        timeout=int(config.get("guild_scan_timeout", 10)))
 
-    classes = await Blizzard.get_classes()
-    for i in classes["classes"]:
-        CLASS._classes[i["id"]] = i["name"]
 
-    dungeons = dict()
-    dungeons_kr = await Blizzard.get_dungeons_kr()
-    dungeons_en = await Blizzard.get_dungeons_en()
-    for i in dungeons_en["dungeons"]:
-        dungeons[i["id"]] = i["name"].lower()
-    for i in dungeons_kr["dungeons"]:
-        if i["id"] in dungeons:
-            DUNGEON._dungeons[dungeons[i["id"]]] = i["name"]
+@update_auctions.before_loop
+@update_roster.before_loop
+async def wait_for_static_data():
+    """
+    저장된 정적 데이터가 없이 처음 실행하면 서버 목록이 없어 첫 갱신을 건너뛰고 한 주기를
+    기다리게 되므로, 정적 데이터를 처음 불러올 때까지 기다렸다가 시작합니다.
+    """
+    if not static_ready.is_set():
+        logger.info("Waiting for static data before starting background updates.")
+    await static_ready.wait()
 
 
 @bot.event
 async def on_ready():
-    logger.info("Logged in as {}".format(bot.user.name))
-    await init_params()
+    logger.info("Logged in as {} (shards {} of {})",
+        bot.user.name, sorted(bot.shards), bot.shard_count)
+    if not update_static_data.is_running():
+        update_static_data.start()
+    if not update_auctions.is_running():
+        update_auctions.start()
+    if not update_roster.is_running():
+        update_roster.start()
 
     game = discord.Game(name=config.get("profile_playing"))
     await bot.change_presence(activity=game)
 
 
+@bot.before_invoke
+async def before_command(ctx):
+    tracing.current_command.set(ctx.command.name)
+    ctx.started = metrics.command_started(ctx.command.name)
+
+
+@bot.after_invoke
+async def after_command(ctx):
+    metrics.command_finished(ctx.command.name, ctx.started, ctx.command_failed)
+
+
 @bot.event
 async def on_command_error(ctx, exception):
     if type(exception) == commands.errors.CommandOnCooldown:
@@ -89,6 +220,64 @@ async def _commands(ctx, *args):
             description=", ".join(commands)))
 
 
+@bot.command(name="상태")
+@commands.has_permissions(administrator=True)
+async def _status(ctx, *args):
+    embed = discord.Embed(
+        title="봇 상태",
+        color=COLOR.BLUE,
+        description="처리 중인 명령어 {}개".format(metrics.commands_in_flight))
+
+    latency = list()
+    for name, h in sorted(metrics.command_latency.items()):
+        latency.append("!{}: {}회, p50 ≤{}s, p95 ≤{}s, 오류 {}회".format(
+            name, h.count, h.quantile(0.5), h.quantile(0.95),
+            metrics.command_errors.get(name, 0)))
+    embed.add_field(
+        name="명령어 응답 시간",
+        value="\n".join(latency) if len(latency) > 0 else "기록 없음",
+        inline=False)
+
+    upstreams = list()
+    for c in HttpClient._clients:
+        upstreams.append("{}: 요청 {}회 ({}), 처리 중 {}, 대기 {}, 중복 제거 {}회".format(
+            c.name, c.stats["requests"],
+            ", ".join("{}: {}".format(k, v) for k, v in sorted(c.responses.items(), key=str)),
+            c.in_flight, c.limiter.queued, c.stats["coalesced"]))
+    embed.add_field(name="API 요청", value="\n".join(upstreams), inline=False)
+
+    caches = list()
+    for c in HttpClient._clients:
+        caches.append("{}: {}개 {:.1f}MB, 적중 {} / 실패 {} / 제거 {}".format(
+            c.name, len(c.cache), c.cache.size / 1024 / 1024,
+            c.cache.stats["hits"], c.cache.stats["misses"], c.cache.stats["evictions"]))
+    for c in CommandCache.caches:
+        caches.append("{}: {}개, 적중 {} / 실패 {} / 제거 {}".format(
+            c.name, len(c),
+            c.stats["hits"] + c.stats["stale_hits"], c.stats["misses"], c.stats["evictions"]))
+    embed.add_field(name="캐시", value="\n".join(caches), inline=False)
+
+    if len(tracing.slow_calls) > 0:
+        embed.add_field(
+            name="최근 느린 요청",
+            value="\n".join(str(s) for s in list(tracing.slow_calls)[-5:]),
+            inline=False)
+    await ctx.send(embed=embed)
+
+
+def _raid_progress(profile):
+    boss_count = len(profile.raid_kills)
+    normal_kills, heroic_kills, mythic_kills = 0, 0, 0
+    for normal, heroic, mythic in profile.raid_kills:
+        normal_kills += (1 if normal > 0 else 0)
+        heroic_kills += (1 if heroic > 0 else 0)
+        mythic_kills += (1 if mythic > 0 else 0)
+    return "일반 {}/{}, 영웅 {}/{}, 신화 {}/{}".format(
+        normal_kills, boss_count,
+        heroic_kills, boss_count,
+        mythic_kills, boss_count)
+
+
 @bot.command(name="캐릭터")
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _character(ctx, *args):
@@ -117,11 +306,9 @@ async def _character(ctx, *args):
                 description="존재하지 않는 서버 이름입니다."))
         return
 
-    res = await asyncio.gather(
-        Raider.get_character(realm_name, character_name),
-        Blizzard.get_character(realm_name, character_name))
+    raider, profile = await CharacterLoader(realm_name, character_name).load("raider", "profile")
 
-    if None in res:
+    if raider is None or profile is None:
         await ctx.send(
             embed=discord.Embed(
                 title="실행 오류",
@@ -129,14 +316,14 @@ async def _character(ctx, *args):
                 description="플레이어를 찾을 수 없습니다."))
         return
 
-    if "guild" in res[1]:
+    if profile.guild is not None:
         embed = discord.Embed(
             title="",
             color=COLOR.BLUE,
             description="<{}>\n{} {}".format(
-                res[1]["guild"]["name"],
-                RACE.KR(res[1]["race"]),
-                CLASS.KR(res[1]["class"])))
+                profile.guild,
+                RACE.KR(profile.race),
+                CLASS.KR(profile.class_id)))
     else:
         embed = discord.Embed(
             title="",
@@ -144,52 +331,44 @@ async def _character(ctx, *args):
             description="")
 
     embed.set_thumbnail(url="{}/{}".format(
-        Blizzard.THUMBNAIL_BASE, res[1]["thumbnail"]))
+        Blizzard.THUMBNAIL_BASE, profile.thumbnail))
     embed.set_author(
         name="{}-{}".format(character_name, REALM.KR(realm_name)),
-        icon_url=thumbnail(GAME_ICON.HORDE if res[1]["faction"] == 1 \
+        icon_url=thumbnail(GAME_ICON.HORDE if profile.faction == 1 \
                            else GAME_ICON.ALLIANCE))
 
     embed.add_field(
         name="아이템 레벨",
         value="최대 {}, 착용 **{}**, 아제로스의 심장 {} ({})".format(
-            res[1]["items"]["averageItemLevel"],
-            res[1]["items"]["averageItemLevelEquipped"],
-            res[1]["items"]["neck"]["azeriteItem"]["azeriteLevel"],
-            res[1]["items"]["neck"]["itemLevel"]))
+            profile.average_item_level,
+            profile.average_item_level_equipped,
+            profile.azerite_level,
+            profile.neck_item_level))
 
     embed.add_field(
         name="2차 스탯",
         value="치명타 {:.2f}%, 가속 {:.2f}%, 특화 {:.2f}%, 유연성 {:.2f}%".format(
-            res[1]["stats"]["crit"],
-            res[1]["stats"]["haste"],
-            res[1]["stats"]["mastery"],
-            res[1]["stats"]["versatilityDamageDoneBonus"]))
+            profile.crit,
+            profile.haste,
+            profile.mastery,
+            profile.versatility))
 
     embed.add_field(
         name="레이더 점수",
-        value="현재 시즌 **{}**점".format(res[0]["mythic_plus_scores_by_season"][0]["scores"]["all"]))
+        value="현재 시즌 **{}**점".format(raider.score))
 
+    best_run = raider.weekly_best
     embed.add_field(
         name="이번주 쐐기 던전 최고기록",
-        value="기록 없음" if len(res[0]["mythic_plus_weekly_highest_level_runs"]) == 0 \
+        value="기록 없음" if best_run is None \
             else "{} {}단 {}".format(
-                DUNGEON.KR(res[0]["mythic_plus_weekly_highest_level_runs"][0]["dungeon"]),
-                res[0]["mythic_plus_weekly_highest_level_runs"][0]["mythic_level"],
-                MYTHIC_PLUS_RESULTS[res[0]["mythic_plus_weekly_highest_level_runs"][0]["num_keystone_upgrades"]]))
+                DUNGEON.KR(best_run.dungeon),
+                best_run.mythic_level,
+                MYTHIC_PLUS_RESULTS[best_run.upgrades]))
 
-    boss_count = len(res[1]["progression"]["raids"][-1]["bosses"])
-    normal_kills, heroic_kills, mythic_kills = 0, 0, 0
-    for boss in res[1]["progression"]["raids"][-1]["bosses"]:
-        normal_kills += (1 if boss["normalKills"] > 0 else 0)
-        heroic_kills += (1 if boss["heroicKills"] > 0 else 0)
-        mythic_kills += (1 if boss["mythicKills"] > 0 else 0)
     embed.add_field(
-        name="{} 진행도".format(res[1]["progression"]["raids"][-1]["name"]),
-        value="일반 {}/{}, 영웅 {}/{}, 신화 {}/{}".format(
-            normal_kills, boss_count,
-            heroic_kills, boss_count,
-            mythic_kills, boss_count))
+        name="{} 진행도".format(profile.raid_name),
+        value=_raid_progress(profile))
 
     embed.add_field(
         name="URL",
@@ -205,6 +384,95 @@ async def _character(ctx, *args):
     await ctx.send(embed=embed)
 
 
+@bot.command(name="비교")
+@commands.cooldown(10, 60, commands.BucketType.user)
+async def _compare(ctx, *args):
+    await ctx.trigger_typing()
+    max_characters = int(config.get("compare_max_characters", 10))
+    if len(args) < 2 or len(args) > max_characters:
+        embed = discord.Embed(
+            title="명령어 오류",
+            color=COLOR.RED,
+            description="명령어 뒤에 '(캐릭터 이름)-(서버 이름)'을 2개에서 {}개까지 적어야 합니다.".format(
+                max_characters))
+        embed.add_field(
+            name="사용 예시",
+            value="!비교 팬더곰-헬스크림 불곰-아즈샤라")
+        if REALM.exists(config.get("default_realm")):
+            embed.set_footer(
+                text="서버 이름을 명시하지 않으면 {} 서버로 간주합니다.".format(
+                    REALM.KR(config.get("default_realm"))))
+        await ctx.send(embed=embed)
+        return
+
+    characters, seen = list(), set()
+    for arg in args:
+        character_name, realm_name = utils.parse_character_name(arg)
+        if not REALM.exists(realm_name):
+            await ctx.send(
+                embed=discord.Embed(
+                    title="실행 오류",
+                    color=COLOR.RED,
+                    description="존재하지 않는 서버 이름입니다. ({})".format(arg)))
+            return
+        # 서버는 한글, 영문, 오타로도 적을 수 있고 캐릭터 이름은 대소문자를 구분하지 않으므로
+        # 같은 캐릭터인지는 정규화한 이름으로 확인합니다.
+        key = (character_name.lower(), REALM.EN(realm_name))
+        if key not in seen:
+            seen.add(key)
+            characters.append((character_name, realm_name))
+
+    # 모든 캐릭터의 요청을 한 번에 동시에 보내므로, 응답 시간은 캐릭터 수가 아니라 가장
+    # 느린 캐릭터 하나의 조회 시간에 가깝습니다.
+    async def load(character):
+        character_name, realm_name = character
+        raider, profile = await CharacterLoader(realm_name, character_name).load("raider", "profile")
+        return None if raider is None or profile is None else (raider, profile)
+
+    res = await fan_out(
+        characters, load,
+        concurrency=int(config.get("compare_concurrency", 10)),
+        timeout=int(config.get("compare_timeout", 10)),
+        name="Character comparison")
+    if res.succeeded == 0:
+        await ctx.send(
+            embed=discord.Embed(
+                title="실행 오류",
+                color=COLOR.RED,
+                description="플레이어를 찾을 수 없습니다."))
+        return
+
+    # 모든 캐릭터의 최근 레이드가 같으면 설명에 한 번만 적고, 다르면 캐릭터마다 적습니다.
+    raids = {loaded[1].raid_name for loaded in res}
+    same_raid = len(raids) == 1
+    embed = discord.Embed(
+        title="캐릭터 비교",
+        color=COLOR.BLUE,
+        description="레이드 진행도: {}".format(raids.pop()) if same_raid else "")
+    missing = list()
+    for (character_name, realm_name), loaded in zip(characters, res.results):
+        if loaded is None:
+            missing.append("{}-{}".format(character_name, REALM.KR(realm_name)))
+            continue
+        raider, profile = loaded
+        embed.add_field(
+            name="{}-{}".format(character_name, REALM.KR(realm_name)),
+            value="{}\n착용 **{}** (최대 {})\n" \
+                "치명 {:.1f}% 가속 {:.1f}%\n특화 {:.1f}% 유연 {:.1f}%\n" \
+                "레이더 **{}**점\n{}".format(
+                CLASS.KR(profile.class_id),
+                profile.average_item_level_equipped,
+                profile.average_item_level,
+                profile.crit, profile.haste, profile.mastery, profile.versatility,
+                raider.score,
+                _raid_progress(profile) if same_raid \
+                    else "{} {}".format(profile.raid_name, _raid_progress(profile))))
+    if len(missing) > 0:
+        embed.set_footer(text="찾을 수 없는 플레이어: {}".format(", ".join(missing)))
+
+    await ctx.send(embed=embed)
+
+
 @bot.command(name="아제특성")
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _azeritePower(ctx, *args):
@@ -233,8 +501,7 @@ async def _azeritePower(ctx, *args):
                 description="존재하지 않는 서버 이름입니다."))
         return
 
-    items = await Blizzard.get_character_items(realm_name, character_name)
-    media = await Blizzard.get_character_media(realm_name, character_name)
+    items, media = await CharacterLoader(realm_name, character_name).load("items", "media")
     if items is None:
         await ctx.send(
             embed=discord.Embed(
@@ -246,21 +513,17 @@ async def _azeritePower(ctx, *args):
     azeriteEssences = {}
     azeritePowers = {}
 
-    for item in items["equipped_items"]:
-        if item["slot"]["type"] in ["HEAD", "SHOULDER", "CHEST"]:
-            for power in item["azerite_details"]["selected_powers"]:
-                subtitle = "{} ({})".format(
-                    item["slot"]["name"], item["level"]["value"])
-                if not subtitle in azeritePowers:
-                    azeritePowers[subtitle] = []
-                if "spell_tooltip" in power:
-                    if power["tier"] >= 3:
-                        azeritePowers[subtitle].append(power["spell_tooltip"]["spell"]["name"])
-        if item["slot"]["type"] == "NECK":
-            for essence in item["azerite_details"]["selected_essences"]:
-                if "essence" in essence:
-                    azeriteEssences[essence["slot"]] \
-                        = "{} {}등급".format(essence["essence"]["name"], essence["rank"])
+    for item in items.items:
+        if item.slot in ["HEAD", "SHOULDER", "CHEST"] and len(item.azerite_powers) > 0:
+            subtitle = "{} ({})".format(item.slot_name, item.level)
+            if not subtitle in azeritePowers:
+                azeritePowers[subtitle] = []
+            for tier, name in item.azerite_powers:
+                if tier >= 3:
+                    azeritePowers[subtitle].append(name)
+        if item.slot == "NECK":
+            for slot, name, rank in item.essences:
+                azeriteEssences[slot] = "{} {}등급".format(name, rank)
 
     essence_msg  = "**주능력**: {}\n".format(azeriteEssences[0]) if 0 in azeriteEssences else ""
     essence_msg += "**부차능력**: {}\n".format(azeriteEssences[1]) if 1 in azeriteEssences else ""
@@ -271,7 +534,7 @@ async def _azeritePower(ctx, *args):
         color=COLOR.BLUE,
         description="")
     if media is not None:
-        embed.set_thumbnail(url=media["avatar_url"])
+        embed.set_thumbnail(url=media.avatar_url)
     embed.add_field(
         name="아제라이트 정수",
         value=essence_msg)
@@ -309,7 +572,7 @@ async def _appearance(ctx, *args):
                 description="존재하지 않는 서버 이름입니다."))
         return
 
-    res = await Blizzard.get_character_media(realm_name, character_name)
+    res, items = await CharacterLoader(realm_name, character_name).load("media", "items")
     if res is None:
         await ctx.send(
             embed=discord.Embed(
@@ -322,24 +585,23 @@ async def _appearance(ctx, *args):
         title="{}-{}".format(character_name, REALM.KR(realm_name)),
         color=COLOR.BLUE,
         description="")
-    embed.set_image(url=res["render_url"])
+    embed.set_image(url=res.render_url)
 
-    items = await Blizzard.get_character_items(realm_name, character_name)
     if items is not None:
         transmogs = list()
-        for item in items["equipped_items"]:
-            if item["slot"]["type"] in ["NECK", "FINGER_1", "FINGER_2", "TRINKET_1", "TRINKET_2"]:
+        for item in items.items:
+            if item.slot in ["NECK", "FINGER_1", "FINGER_2", "TRINKET_1", "TRINKET_2"]:
                 continue
-            if "transmog" in item:
+            if item.transmog_id is not None:
                 transmogs.append("{}: [{}](https://ko.wowhead.com/item={}) *".format(
-                    item["inventory_type"]["name"],
-                    item["transmog"]["item"]["name"],
-                    item["transmog"]["item"]["id"]))
+                    item.inventory_type,
+                    item.transmog_name,
+                    item.transmog_id))
             else:
                 transmogs.append("{}: [{}](https://ko.wowhead.com/item={})".format(
-                    item["inventory_type"]["name"],
-                    item["name"],
-                    item["item"]["id"]))
+                    item.inventory_type,
+                    item.name,
+                    item.item_id))
         embed.add_field(
             name="형상 정보",
             value="\n".join(transmogs))
@@ -348,7 +610,7 @@ async def _appearance(ctx, *args):
 
 
 @bot.command(name="어픽스")
-@static_result(600)
+@static_result(600, stale_while_revalidate=True)
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _affixes(ctx):
     await ctx.trigger_typing()
@@ -391,7 +653,7 @@ async def _affixes(ctx):
 
 
 @bot.command(name="토큰")
-@static_result(600)
+@static_result(600, stale_while_revalidate=True)
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _token(ctx, *args):
     await ctx.trigger_typing()
@@ -408,11 +670,89 @@ async def _token(ctx, *args):
     embed = discord.Embed(
         title="한국 서버 토큰 시세",
         color=COLOR.BLUE,
-        description="{}골드".format(int(res["price"] / 10000)))
+        description="{}골드".format(utils.to_gold(res["price"])))
     await ctx.send(embed=embed)
     return embed
 
 
+@bot.command(name="경매")
+@commands.cooldown(10, 60, commands.BucketType.user)
+async def _auction(ctx, *args):
+    if len(args) == 0:
+        embed = discord.Embed(
+            title="명령어 오류",
+            color=COLOR.RED,
+            description="명령어 뒤에 '(아이템 이름)' 또는 '(아이템 ID)'를 적어야 합니다.")
+        embed.add_field(
+            name="사용 예시",
+            value="!경매 152505 : 현재 경매장 시세를 확인합니다.\n" \
+                + "!경매 152505 7일 : 최근 7일간의 시세 변화를 확인합니다.")
+        await ctx.send(embed=embed)
+        return
+
+    days = None
+    if len(args) > 1 and re.match(r"^\d+일$", args[-1]):
+        days = int(args[-1][:-1])
+        args = args[:-1]
+
+    realm_name = config.get("default_realm")
+    snapshot = AuctionHouse.get(realm_name)
+    if snapshot is None:
+        await ctx.send(
+            embed=discord.Embed(
+                title="실행 오류",
+                color=COLOR.RED,
+                description="아직 경매장 정보를 불러오지 못했습니다. 잠시 후 다시 시도해주세요."))
+        return
+
+    item_name = " ".join(args)
+    loop = asyncio.get_event_loop()
+    item_id = int(item_name) if item_name.isdigit() \
+        else await loop.run_in_executor(None, Blizzard.item_info.find, item_name)
+    res = None if item_id is None else snapshot.price_stats(item_id)
+    if res is None:
+        await ctx.send(
+            embed=discord.Embed(
+                title="실행 오류",
+                color=COLOR.RED,
+                description="경매장에 등록된 아이템을 찾을 수 없습니다."))
+        return
+
+    item = await loop.run_in_executor(None, Blizzard.item_info.get, item_id)
+    if item is not None:
+        item_name = item["name"]
+
+    updated = datetime.fromtimestamp(int(snapshot.last_modified / 1000)) + timedelta(hours=9)
+    embed = discord.Embed(
+        title="{} 경매장 시세".format(item_name),
+        color=COLOR.BLUE,
+        description="{} 서버, {} 기준".format(
+            REALM.KR(realm_name), updated.strftime("%Y-%m-%d %H:%M")))
+    if res["min"] is not None:
+        embed.add_field(
+            name="개당 즉시 구매가",
+            value="최저 **{}**골드, 하위 25% {}골드, 중간값 **{}**골드, 상위 25% {}골드".format(
+                utils.to_gold(res["min"]),
+                utils.to_gold(res["percentiles"][25]),
+                utils.to_gold(res["percentiles"][50]),
+                utils.to_gold(res["percentiles"][75])))
+    embed.add_field(
+        name="등록 현황",
+        value="{}건, 총 {}개".format(res["auctions"], res["quantity"]))
+
+    if days is not None:
+        trend = list()
+        for day, low, median, quantity in price_history.daily(item_id, time.time() - days * DAY):
+            trend.append("{}: 최저 {}골드, 중간값 {}골드, {}개".format(
+                (datetime.utcfromtimestamp(day) + timedelta(hours=9)).strftime("%m-%d"),
+                utils.to_gold(low), utils.to_gold(median), quantity))
+        embed.add_field(
+            name="최근 {}일 시세".format(days),
+            value="\n".join(trend[-20:]) if len(trend) > 0 else "기록 없음",
+            inline=False)
+    await ctx.send(embed=embed)
+
+
 @bot.command(name="특성")
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _talent(ctx, *args):
@@ -442,12 +782,22 @@ async def _talent(ctx, *args):
                 description="존재하지 않는 서버 이름입니다."))
         return
 
-    res = await Blizzard.get_character_talents(
-        realm_name, character_name)
+    res = await CharacterLoader(realm_name, character_name).get("talents")
+    if res is None:
+        await ctx.send(
+            embed=discord.Embed(
+                title="실행 오류",
+                color=COLOR.RED,
+                description="플레이어를 찾을 수 없습니다."))
+        return
 
     if len(args) > 1:
-        spec = WCL_CLASS.get_by_abbreviation(args[1])
-        if spec is not None:
+        specs = WCL_CLASS.find_by_abbreviation(args[1])
+        if len(specs) > 0:
+            # '냉기'처럼 여러 직업에 해당하는 줄임말은 캐릭터의 직업으로 구분합니다.
+            spec_names = {t.name for t in res.specs}
+            matched = [s for s in specs if spec_names <= WCL_CLASS.spec_names(s.class_id)]
+            spec = matched[0] if len(matched) > 0 else specs[0]
             # !특성 (캐릭터이름) (전문화)
             embed = discord.Embed(
                 title="",
@@ -455,17 +805,15 @@ async def _talent(ctx, *args):
                 description="")
             embed.set_author(
                 name="{}-{}".format(character_name, REALM.KR(realm_name)),
-                icon_url=thumbnail(GAME_ICON.HORDE if res["faction"] == 1 \
+                icon_url=thumbnail(GAME_ICON.HORDE if res.faction == 1 \
                                    else GAME_ICON.ALLIANCE))
 
             found = False
-            for talent in res["talents"]:
-                if "spec" in talent and talent["spec"]["name"] in spec.abbreviations:
+            for talent in res.specs:
+                if talent.name in spec.abbreviations:
                     selected = [None] * 7
-                    for t in talent["talents"]:
-                        selected[t["tier"]] = [
-                            t["spell"]["name"],
-                            t["spell"]["description"]]
+                    for t in talent.talents:
+                        selected[t.tier] = [t.name, t.description]
                     for i, s in enumerate(selected):
                         if s is not None:
                             s[1] = re.sub("(\\r\\n)+|(\\n\\n)+", " ", s[1])
@@ -476,11 +824,15 @@ async def _talent(ctx, *args):
                     found = True
 
             if not found:
+                description = "캐릭터와 전문화가 일치하지 않습니다."
+                if len(specs) > 1:
+                    description += "\n'{}'은(는) {} 중 하나입니다.".format(
+                        args[1], ", ".join(s.name for s in specs))
                 await ctx.send(
                     embed=discord.Embed(
                         title="실행 오류",
                         color=COLOR.RED,
-                        description="캐릭터와 전문화가 일치하지 않습니다."))
+                        description=description))
                 return
 
             if None in selected:
@@ -510,87 +862,36 @@ async def _talent(ctx, *args):
             description="")
         embed.set_author(
             name="{}-{}".format(character_name, REALM.KR(realm_name)),
-            icon_url=thumbnail(GAME_ICON.HORDE if res["faction"] == 1 \
+            icon_url=thumbnail(GAME_ICON.HORDE if res.faction == 1 \
                                else GAME_ICON.ALLIANCE))
 
-        for talent in res["talents"]:
-            if not "spec" in talent:
-                continue
-            main_spec = True if "selected" in talent and talent["selected"] else False
+        for talent in res.specs:
             selected = [None] * 7
-            for t in talent["talents"]:
-                selected[t["tier"]] = "[{}] {}".format(
-                    t["column"] + 1, t["spell"]["name"])
+            for t in talent.talents:
+                selected[t.tier] = "[{}] {}".format(t.column + 1, t.name)
             if not None in selected:
                 embed.add_field(
-                    name=talent["spec"]["name"] + ("*" if main_spec else ""),
+                    name=talent.name + ("*" if talent.selected else ""),
                     value="\n".join(selected))
         await ctx.send(embed=embed)
 
 
 @bot.command(name="주차")
 @is_in_guild()
-@static_result(600)
 @commands.cooldown(10, 60, commands.BucketType.user)
 async def _highest_mythic_plus(ctx, *args):
-    await ctx.trigger_typing()
-
-    res = await Blizzard.get_guild_members(
-        config.get("default_realm"), config.get("default_guild"))
-    if res is None:
-        await ctx.send(
-            embed=discord.Embed(
-                title="실행 오류",
-                color=COLOR.RED,
-                description="길드원 목록을 불러오는 데 실패했습니다."))
-        return None
-
-    members = list()
-    for member in res["members"]:
-        if member["character"]["level"] >= MAX_LEVEL:
-            members.append(member["character"]["name"])
-    if len(members) == 0:
+    if not roster.ready:
         await ctx.send(
             embed=discord.Embed(
                 title="실행 오류",
                 color=COLOR.RED,
-                description="길드원 중 {}레벨 캐릭터가 없습니다.".format(MAX_LEVEL)))
-        return None
-
-    tasks = list()
-    for m in members:
-        tasks.append(Raider.get_character(config.get("default_realm"), m))
-    mythic_members = await asyncio.gather(*tasks)
-
-    classified = {
-        "15단 이상": [],
-        "10단 이상": [],
-        "10단 미만": [],
-        "쐐기 간 적 없음": []
-    }
-    for m in mythic_members:
-        if m is None:
-            continue
-        if m["mythic_plus_scores_by_season"][0]["scores"]["all"] > 0:
-            if len(m["mythic_plus_weekly_highest_level_runs"]) > 0:
-                best_run = m["mythic_plus_weekly_highest_level_runs"][0]
-                if best_run["mythic_level"] >= 15:
-                    classified["15단 이상"].append("{}({})".format(
-                        m["name"], best_run["mythic_level"]))
-                elif best_run["mythic_level"] >= 10:
-                    classified["10단 이상"].append("{}({})".format(
-                        m["name"], best_run["mythic_level"]))
-                else:
-                    classified["10단 미만"].append("{}({})".format(
-                        m["name"], best_run["mythic_level"]))
-            else:
-                classified["쐐기 간 적 없음"].append(m["name"])
+                description="아직 길드원 정보를 불러오지 못했습니다. 잠시 후 다시 시도해주세요."))
+        return
 
-    period = await Blizzard.get_mythic_keystone_period()
     period_s = ""
-    if period is not None:
-        start = datetime.fromtimestamp(int(period["start_timestamp"] / 1000)) + timedelta(hours=9)
-        end = datetime.fromtimestamp(int(period["end_timestamp"] / 1000)) + timedelta(hours=9)
+    if roster.period is not None:
+        start = datetime.fromtimestamp(int(roster.period["start_timestamp"] / 1000)) + timedelta(hours=9)
+        end = datetime.fromtimestamp(int(roster.period["end_timestamp"] / 1000)) + timedelta(hours=9)
         period_s = "{} ~ {}".format(
             start.strftime("%Y-%m-%d %H:%M"),
             end.strftime("%Y-%m-%d %H:%M"))
@@ -599,17 +900,26 @@ async def _highest_mythic_plus(ctx, *args):
         title="이번주 길드원 쐐기 던전 현황",
         color=COLOR.BLUE,
         description=period_s)
-    for i in classified:
-        if len(classified[i]) > 0:
-            embed.add_field(name=i, value=", ".join(classified[i]))
-    embed.set_footer(text="* 이번 시즌에 쐐기 던전을 간 적이 있는 캐릭터만 표시됩니다.")
+    for i in roster.table:
+        if len(roster.table[i]) > 0:
+            embed.add_field(name=i, value=", ".join(roster.table[i]))
+    footer = "* 이번 시즌에 쐐기 던전을 간 적이 있는 캐릭터만 표시됩니다.\n" \
+        + "* {} 기준 정보입니다.".format(
+            (datetime.fromtimestamp(int(roster.updated_at)) + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M"))
+    if roster.failed > 0:
+        footer += "\n* 길드원 {}명 중 {}명의 정보를 불러오지 못했습니다.".format(
+            roster.total, roster.failed)
+    embed.set_footer(text=footer)
     await ctx.send(embed=embed)
-    return embed
 
 
-if __name__ == "__main__":
+def main():
     token = config.get("discord_token")
     if token is None:
         logger.error("Failed to get discord token.")
     else:
         bot.run(token)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import sys
+import time
+from collections import OrderedDict
+
+import logger
+import decoder
+
+
+def estimate_size(data):
+    """
+    캐시에 저장하는 데이터가 차지하는 메모리를 바이트 단위로 추정합니다. dict, list, tuple과
+    __slots__ 모델 객체를 따라가며 sys.getsizeof()를 더하고, 같은 객체는 한 번만 셉니다.
+    받은 본문 길이는 모델 객체나 해석한 JSON의 실제 크기와 크게 다르므로 이 값으로
+    max_bytes를 적용합니다.
+    """
+    if isinstance(data, bytes):
+        return sys.getsizeof(data)
+    seen = set()
+    size = 0
+    pending = [data]
+    while len(pending) > 0:
+        value = pending.pop()
+        if value is None or id(value) in seen:
+            continue
+        seen.add(id(value))
+        size += sys.getsizeof(value)
+        if isinstance(value, dict):
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif hasattr(type(value), "__slots__"):
+            pending.extend(getattr(value, name, None) for name in type(value).__slots__)
+    return size
+
+
+class CacheEntry:
+    __slots__ = ("data", "size", "expires_at", "etag", "last_modified")
+
+    def __init__(self, data, size, expires_at, etag=None, last_modified=None):
+        self.data = data
+        self.size = size
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    API 응답을 엔드포인트마다 정해진 시간(TTL) 동안 저장하는 LRU 캐시입니다.
+    항목 수와 저장된 데이터가 차지하는 메모리(estimate_size()로 계산한 추정치)의 합이 모두
+    제한되며, 둘 중 하나라도 넘으면 가장 오래 사용하지 않은 항목부터 제거합니다. 시간은 시스템 시계가 바뀌어도 영향을 받지 않도록
+    time.monotonic()을 사용합니다.
+    TTL이 지난 항목도 제거되기 전까지는 남겨 두어, ETag나 Last-Modified 값으로 서버에
+    변경 여부만 확인(conditional request)할 수 있도록 합니다.
+    shared가 주어지면 여러 프로세스가 함께 쓰는 2차 캐시로 사용합니다. 이 캐시에 없는
+    항목은 shared에서 찾아 가져오고, 새로 저장하는 응답은 shared에도 저장합니다.
+    shared를 읽을 수 있도록 get()과 peek()은 코루틴이며, 이 캐시에 있는 항목은 기다리지
+    않고 바로 리턴합니다.
+
+    Parameters
+    ---
+    max_entries : 저장할 수 있는 최대 항목 수
+    max_bytes : 저장된 데이터가 차지하는 메모리 합의 최댓값 (바이트)
+    shared : 프로세스 사이에 공유하는 SharedCache (없으면 사용하지 않음)
+    """
+    def __init__(self, max_entries, max_bytes, shared=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.size = 0
+        self._entries = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key, model=None):
+        entry = self._entries.get(key)
+        if entry is not None and entry.fresh:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry.data
+
+        entry = await self._load_shared(key, model)
+        if entry is None or not entry.fresh:
+            self.stats["misses"] += 1
+            return None
+        self.stats["shared_hits"] += 1
+        return entry.data
+
+    async def peek(self, key, model=None):
+        """TTL이 지났더라도 저장된 항목을 리턴합니다. 통계와 LRU 순서는 바꾸지 않습니다."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = await self._load_shared(key, model)
+        return entry
+
+    async def _load_shared(self, key, model=None):
+        """
+        shared에 저장된 항목이 이 캐시의 항목보다 새로우면 가져와 저장합니다. 다른
+        프로세스가 먼저 받아 온 응답이나 304로 만료 시각을 늦춘 응답을 여기서 가져옵니다.
+        shared에는 응답 본문이 저장되어 있으므로, model이 주어지면 해석한 JSON으로
+        model 객체를 만들어 저장합니다.
+        """
+        if self.shared is None:
+            return None
+        row = await self.shared.get(key)
+        if row is None:
+            return self._entries.get(key)
+
+        body, expires_at, etag, last_modified = row
+        expires_at = time.monotonic() + expires_at - time.time()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at >= expires_at:
+            return entry
+        try:
+            data = decoder.loads(body)
+            if model is not None:
+                data = model(data)
+        except (ValueError, KeyError, TypeError) as e:
+            # 다른 프로세스가 쓰다 만 항목이나, 배포 사이에 모델이 바뀌어 만들 수 없는
+            # 항목은 지우고 없는 것으로 취급합니다.
+            logger.warning("Dropped unreadable shared cache entry {}: {!r}", key, e)
+            self.shared.delete(key)
+            return entry
+        self._store(key, data, expires_at, etag, last_modified)
+        return self._entries.get(key)
+
+    def refresh(self, key, ttl):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.expires_at = time.monotonic() + ttl
+            self._entries.move_to_end(key)
+        if self.shared is not None:
+            self.shared.touch(key, time.time() + ttl)
+
+    def set(self, key, data, ttl, etag=None, last_modified=None, body=None):
+        """응답 데이터를 저장합니다. 응답 본문(body)이 주어지면 shared에도 저장합니다."""
+        self._store(key, data, time.monotonic() + ttl, etag, last_modified)
+        if self.shared is not None and body is not None:
+            self.shared.set(key, body, time.time() + ttl, etag, last_modified)
+
+    def _store(self, key, data, expires_at, etag, last_modified):
+        size = estimate_size(data)
+        if size > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = CacheEntry(data, size, expires_at, etag, last_modified)
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+            self.stats["evictions"] += 1
+
+    def pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
@@ -0,0 +1,266 @@
+import time
+import sqlite3
+import asyncio
+import aiohttp
+import contextlib
+from urllib import parse
+from email.utils import formatdate
+
+from cache import ResponseCache
+from shared_cache import SharedCache
+from ratelimit import RateLimiter, retry_after
+import tracing
+import decoder
+import logger
+import config
+
+
+class HttpClient:
+    """
+    API 서버(upstream)마다 하나씩 만들어 봇이 실행되는 동안 계속 재사용하는 HTTP 클라이언트입니다.
+    매 요청마다 새 ClientSession을 만들면 커넥터 생성, DNS 조회, TLS 핸드셰이크를 매번 다시
+    해야 하므로, 세션을 하나만 두고 keep-alive 연결 풀과 DNS 캐시를 공유합니다.
+    세션은 처음 사용할 때 만들어지며 봇이 종료될 때 close_all()로 한 번에 닫습니다.
+    여러 프로세스로 샤드를 나누어 실행할 때는 초당/시간당 요청 수 제한을 워커 수로 나누고,
+    cache_shared 설정이 있으면 응답 캐시를 프로세스 사이에 공유합니다.
+
+    Parameters
+    ---
+    name : 로그 및 통계에 표시할 upstream 이름
+    rate : 초당 최대 요청 수
+    burst : 한 번에 몰아서 보낼 수 있는 최대 요청 수
+    hourly : 시간당 최대 요청 수 (없으면 제한하지 않음)
+    """
+    MAX_RETRIES = 2
+
+    _clients = list()
+    shared = None
+    _shared_opened = False
+
+    def __init__(self, name, rate, burst, hourly=None):
+        self.name = name
+        workers = int(config.get("shard_workers", 1))
+        self.limiter = RateLimiter(
+            name, rate / workers, max(1, burst // workers),
+            None if hourly is None else hourly // workers)
+        self._session = None
+        self._inflight = dict()
+        if not HttpClient._shared_opened and config.get("cache_shared", "") != "":
+            HttpClient._shared_opened = True
+            HttpClient.shared = _open_shared_cache()
+        self.cache = ResponseCache(
+            int(config.get("cache_max_entries", 2000)),
+            int(config.get("cache_max_bytes", 64 * 1024 * 1024)),
+            shared=HttpClient.shared)
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "not_modified": 0,
+        }
+        self.responses = dict()
+        self.decoding = dict()
+        self.in_flight = 0
+        HttpClient._clients.append(self)
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=int(config.get("http_limit", 100)),
+                limit_per_host=int(config.get("http_limit_per_host", 20)),
+                ttl_dns_cache=int(config.get("http_dns_cache", 300)),
+                keepalive_timeout=int(config.get("http_keepalive", 30)))
+            timeout = aiohttp.ClientTimeout(
+                total=int(config.get("http_timeout", 10)))
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout,
+                trace_configs=[tracing.trace_config()])
+            logger.debug("Opened HTTP session for {}.", self.name)
+        return self._session
+
+    @contextlib.asynccontextmanager
+    async def get(self, url, endpoint=None, **kwargs):
+        """
+        url로 GET 요청을 보냅니다. 응답 본문을 다 읽을 때까지의 시간을 endpoint 이름으로
+        기록하며, endpoint가 없으면 URL 경로를 사용합니다.
+        """
+        span = tracing.Span(self.name, endpoint or parse.urlsplit(url).path)
+        try:
+            async with self.session.get(url, trace_request_ctx=span, **kwargs) as response:
+                span.status = response.status
+                try:
+                    yield response
+                finally:
+                    # 본문이 없는 응답(304, 본문 없는 429/500)은 EmptyStreamReader라 total_bytes가 없습니다.
+                    span.bytes = getattr(response.content, "total_bytes", 0)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            span.status = "error"
+            raise
+        finally:
+            tracing.finish(span)
+
+    @contextlib.asynccontextmanager
+    async def stream(self, url, endpoint=None, **kwargs):
+        """
+        본문을 나누어 읽는 큰 응답(경매장 덤프 등)을 위한 GET 요청입니다. get_json()과
+        같이 요청 속도 제한과 우선순위를 거치며, 429를 받으면 Retry-After 동안 이
+        upstream의 요청을 멈춥니다. 재시도는 하지 않으므로 호출한 쪽에서 상태를 확인합니다.
+        """
+        await self.limiter.acquire()
+        self.stats["requests"] += 1
+        self.in_flight += 1
+        try:
+            async with self.get(url, endpoint=endpoint, **kwargs) as response:
+                self.responses[response.status] = self.responses.get(response.status, 0) + 1
+                if response.status == 429:
+                    self.limiter.block(retry_after(response))
+                yield response
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self.responses["error"] = self.responses.get("error", 0) + 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    async def get_json(self, url, headers=None, ttl=None, endpoint=None, model=None):
+        """
+        url로 GET 요청을 보내고 (status, JSON 데이터)를 리턴합니다. 응답이 200이 아니면
+        데이터는 None입니다.
+        ttl(초)이 주어지면 성공한 응답을 캐시에 저장해 두고 그동안은 요청을 보내지 않습니다.
+        TTL이 지난 뒤에는 저장해 둔 ETag와 Last-Modified로 조건부 요청을 보내고, 서버가
+        304를 응답하면 본문을 다시 받지 않고 저장된 데이터의 TTL만 갱신합니다.
+        같은 엔드포인트와 파라미터에 대한 요청이 이미 진행 중이면 새 요청을 보내지 않고
+        진행 중인 요청의 결과를 함께 기다립니다. 캐시나 진행 중인 요청에서 리턴되는
+        데이터는 호출한 쪽끼리 공유되므로 수정하지 않아야 합니다.
+        model이 주어지면 JSON 데이터 대신 model(데이터)로 만든 객체를 리턴하고 캐시합니다.
+        """
+        key = normalize_url(url)
+        if ttl is not None:
+            data = await self.cache.get(key, model)
+            if data is not None:
+                return 200, data
+
+        if key in self._inflight:
+            self.stats["coalesced"] += 1
+            logger.debug("Coalesced request to {}.", key)
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.ensure_future(
+            self._get_json(url, headers, key, ttl, endpoint, model))
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _get_json(self, url, headers, key, ttl, endpoint, model):
+        entry = await self.cache.peek(key, model) if ttl is not None else None
+        if entry is not None:
+            headers = dict(headers or {})
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        for attempt in range(self.MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            self.stats["requests"] += 1
+            self.in_flight += 1
+            try:
+                async with self.get(url, endpoint=endpoint, headers=headers) as response:
+                    self.responses[response.status] = self.responses.get(response.status, 0) + 1
+                    if response.status == 429 and attempt < self.MAX_RETRIES:
+                        self.limiter.block(retry_after(response))
+                        continue
+                    if response.status == 304 and entry is not None:
+                        self.stats["not_modified"] += 1
+                        self.cache.refresh(key, ttl)
+                        return 200, entry.data
+                    if response.status == 200:
+                        body = await response.read()
+                        data = self.decode(body, endpoint or parse.urlsplit(url).path)
+                        if data is None:
+                            return response.status, None
+                        last_modified = _last_modified(response, data)
+                        if model is not None:
+                            data = model(data)
+                        if ttl is not None:
+                            self.cache.set(
+                                key, data, ttl,
+                                etag=response.headers.get("ETag"),
+                                last_modified=last_modified,
+                                body=body)
+                        return response.status, data
+                    return response.status, None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.responses["error"] = self.responses.get("error", 0) + 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    def decode(self, body, endpoint):
+        """
+        응답 본문을 설정한 JSON 해석 함수로 해석하고, 엔드포인트별로 해석 횟수, 걸린
+        시간(초), 본문 크기(바이트)의 합을 기록합니다. 해석할 수 없으면 None을 리턴합니다.
+        """
+        started = time.perf_counter()
+        try:
+            data = decoder.loads(body)
+        except ValueError as e:
+            logger.error("Failed to decode {} from {}: {}", endpoint, self.name, e)
+            return None
+        stats = self.decoding.setdefault(endpoint, [0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+        stats[2] += len(body)
+        return data
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.debug("Closed HTTP session for {}.", self.name)
+        self._session = None
+
+    @classmethod
+    async def start_all(cls):
+        for c in cls._clients:
+            c.session
+
+    @classmethod
+    async def close_all(cls):
+        await asyncio.gather(*[c.close() for c in cls._clients])
+        if cls.shared is not None:
+            cls.shared.close()
+
+
+def _open_shared_cache():
+    """
+    cache_shared 설정의 공유 캐시를 엽니다. 파일을 열 수 없으면 로그를 남기고 공유 캐시
+    없이 실행합니다.
+    """
+    path = config.get("cache_shared")
+    try:
+        return SharedCache(path, int(config.get("cache_shared_max_entries", 20000)))
+    except sqlite3.Error as e:
+        logger.error("Failed to open shared cache '{}'; running without it: {}", path, e)
+        return None
+
+
+def normalize_url(url):
+    """
+    같은 요청이 같은 키를 갖도록 URL을 정규화합니다. scheme과 host는 소문자로 바꾸고
+    쿼리 파라미터는 이름순으로 정렬합니다.
+    """
+    parsed = parse.urlsplit(url)
+    query = sorted(parse.parse_qsl(parsed.query, keep_blank_values=True))
+    return parse.urlunsplit((
+        parsed.scheme.lower(), parsed.netloc.lower(), parsed.path,
+        parse.urlencode(query), ""))
+
+
+def _last_modified(response, data):
+    """
+    Last-Modified 헤더가 없으면 캐릭터 데이터의 lastModified(밀리초) 값을 대신 사용합니다.
+    """
+    if "Last-Modified" in response.headers:
+        return response.headers["Last-Modified"]
+    if isinstance(data, dict) and isinstance(data.get("lastModified"), int):
+        return formatdate(data["lastModified"] / 1000, usegmt=True)
+    return None
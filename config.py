@@ -39,9 +39,11 @@ def read_config(filename):
     else:
         print("Cannot read config file '{}'.".format(filename))
 
-def get(label):
+def get(label, default=None):
     if label in _CONFIG_DATA:
         return _CONFIG_DATA[label]
+    if default is not None:
+        return default
     print("Cannot find config value '{}'.".format(label))
     return None
 
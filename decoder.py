@@ -0,0 +1,45 @@
+"""
+API 응답 본문(bytes)을 JSON으로 해석하는 함수를 설정에 따라 고릅니다.
+orjson이 설치되어 있으면 표준 json 모듈보다 몇 배 빠르게 해석하며, 설치되어 있지 않으면
+표준 json 모듈을 사용합니다. 어느 쪽이든 본문을 문자열로 바꾸지 않고 bytes를 그대로
+해석합니다.
+
+설정 (http_json_decoder)
+---
+auto : orjson이 있으면 orjson, 없으면 json (기본값)
+orjson : orjson (설치되어 있지 않으면 json)
+json : 표준 json 모듈
+"""
+import json
+
+import logger
+import config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKENDS = {"json": json.loads}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+
+def _select(name):
+    if name == "auto":
+        name = "orjson" if "orjson" in BACKENDS else "json"
+    if name not in BACKENDS:
+        logger.warning("JSON decoder '{}' is not available; using json.", name)
+        name = "json"
+    return name, BACKENDS[name]
+
+
+name, loads = _select(config.get("http_json_decoder", "auto"))
+
+
+def use(backend):
+    """사용할 JSON 해석 함수를 바꿉니다. 실제로 선택된 이름을 리턴합니다."""
+    global name, loads
+    name, loads = _select(backend)
+    return name
@@ -1,16 +1,69 @@
+import time
 import asyncio
-import aiohttp
+import traceback
 from functools import wraps
-from datetime import datetime, timedelta
+from collections import OrderedDict
+import discord
 from discord.ext import commands
 
 import logger
 import config
 
 
-_instant_result = dict()
+class CommandCache:
+    """
+    static_result로 감싼 명령어 하나의 결과 캐시입니다. 결과는 discord.Embed 객체가 아니라
+    embed.to_dict()로 바꾼 데이터로 저장하며, 최대 max_entries개까지 LRU 순서로 보관합니다.
+    """
+    caches = list()
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.inflight = dict()
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+        CommandCache.caches.append(self)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, result):
+        self.entries[key] = (time.monotonic(), result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+
+class _SilentContext:
+    """백그라운드 갱신에 사용하는 Context입니다. 채널에 메시지를 보내지 않습니다."""
+    def __init__(self, ctx):
+        self._ctx = ctx
 
-def static_result(refresh_time:int):
+    def __getattr__(self, name):
+        return getattr(self._ctx, name)
+
+    async def trigger_typing(self):
+        pass
+
+    async def send(self, *args, **kwargs):
+        pass
+
+
+def static_result(refresh_time:int, max_entries:int=256, stale_while_revalidate:bool=False):
     """
     이 데코레이터는 여러 사용자가 명령어를 입력해도 같은 값이 나올 때 사용합니다.
     해당 명령어가 처음 불리면 API와의 통신을 통해 결과를 리턴하고 임시 메모리에 해당
@@ -18,36 +71,85 @@ def static_result(refresh_time:int):
     명령어가 호출되면 API와 통신하지 않고 저장된 결과를 대신 리턴합니다. 초기화 시간을
     초과했다면 다음 명령어 호출에 다시 새로운 결과를 메모리에 저장합니다.
     명령어에 파라미터가 있다면 결과 데이터는 파라미터마다 따로 저장됩니다.
+    결과를 만드는 도중에 같은 명령어가 다시 호출되면 API와 다시 통신하지 않고 진행 중인
+    결과를 함께 기다립니다.
+    stale_while_revalidate가 켜져 있으면 시간이 지난 결과라도 바로 응답하고, 새 결과는
+    백그라운드에서 한 번만 만들어 저장합니다.
 
     Parameters
     ---
     refresh_time : 명령어를 통해 새로 저장한 결과 데이터가 유효한 시간 (초)
+    max_entries : 저장할 수 있는 결과 데이터의 최대 개수
+    stale_while_revalidate : 시간이 지난 결과로 먼저 응답할지 여부
     """
     def decorator(f):
+        cache = CommandCache(f.__name__, max_entries)
+
+        async def refresh(key, *args, **kwargs):
+            result = await f(*args, **kwargs)
+            if result is not None:
+                cache.set(key, result.to_dict())
+            return result
+
+        def single_flight(key, *args, **kwargs):
+            if key not in cache.inflight:
+                future = asyncio.ensure_future(refresh(key, *args, **kwargs))
+                cache.inflight[key] = future
+                future.add_done_callback(lambda _: cache.inflight.pop(key, None))
+            return cache.inflight[key]
+
         @wraps(f)
         async def wrapper(*args, **kwargs):
             ctx = args[0]
+            key = tuple(args[1:])
             fname = "{}({})".format(f.__name__, ",".join(args[1:]))
-            if fname in _instant_result:
-                last_updated = _instant_result[fname]["last_updated"]
-                if datetime.now() > last_updated + timedelta(seconds=refresh_time):
-                    result = await f(*args, **kwargs)
-                    if result is not None:
-                        _instant_result[fname] = {
-                            "last_updated": datetime.now(),
-                            "result": result}
-                    return result
-                else:
-                    logger.debug("Returned previous data for '{}'.".format(fname))
-                    await ctx.send(embed=_instant_result[fname]["result"])
-                    return _instant_result[fname]["result"]
-            else:
-                result = await f(*args, **kwargs)
+
+            entry = cache.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age <= refresh_time or stale_while_revalidate:
+                    if age > refresh_time:
+                        cache.stats["stale_hits"] += 1
+                        single_flight(key, _SilentContext(ctx), *args[1:], **kwargs)
+                    else:
+                        cache.stats["hits"] += 1
+                    logger.debug("Returned previous data for '{}'.", fname)
+                    embed = discord.Embed.from_dict(entry[1])
+                    await ctx.send(embed=embed)
+                    return embed
+
+            if key in cache.inflight:
+                cache.stats["coalesced"] += 1
+                result = await asyncio.shield(cache.inflight[key])
                 if result is not None:
-                    _instant_result[fname] = {
-                        "last_updated": datetime.now(),
-                        "result": result}
-                return result
+                    embed = discord.Embed.from_dict(result.to_dict())
+                    await ctx.send(embed=embed)
+                    return embed
+
+            cache.stats["misses"] += 1
+            return await asyncio.shield(single_flight(key, *args, **kwargs))
+        return wrapper
+    return decorator
+
+def background_task(name:str):
+    """
+    tasks.loop로 반복하는 백그라운드 작업에서 예외가 나도 반복이 멈추지 않도록, 예외를 로그로
+    남기고 다음 반복을 기다립니다. discord.ext.tasks는 연결 오류 외의 예외가 나면 반복을
+    멈추므로 @tasks.loop 바로 아래에 사용합니다.
+
+    Parameters
+    ---
+    name : 로그에 표시할 작업 이름
+    """
+    def decorator(f):
+        @wraps(f)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await f(*args, **kwargs)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.error("Background task '{}' failed:\n{}", name, traceback.format_exc())
         return wrapper
     return decorator
 
@@ -0,0 +1,74 @@
+import time
+import asyncio
+
+import logger
+
+
+class FanOutResult:
+    """
+    fan_out()의 결과입니다. results는 입력 순서대로 각 항목의 결과를 담으며, 실패하거나
+    시간이 초과된 항목은 None입니다.
+    """
+    def __init__(self, total):
+        self.total = total
+        self.results = [None] * total
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.elapsed = 0.0
+
+    @property
+    def done(self):
+        return self.succeeded + self.failed + self.timed_out
+
+    @property
+    def success_rate(self):
+        return self.succeeded / self.total if self.total > 0 else 1.0
+
+    def __iter__(self):
+        return (r for r in self.results if r is not None)
+
+
+async def fan_out(items, fn, concurrency=8, timeout=None, name="fan-out"):
+    """
+    items의 각 항목에 대해 코루틴 함수 fn을 실행하되, 동시에 최대 concurrency개까지만
+    실행합니다. 항목 하나가 timeout(초)을 넘기거나 예외를 일으켜도 나머지 항목은 계속
+    처리하며, 성공한 결과만 모아 리턴합니다. fn이 None을 리턴하면 실패로 셉니다.
+    fan_out()을 기다리는 쪽이 취소되면 남은 항목을 처리하지 않고 함께 취소됩니다.
+
+    Parameters
+    ---
+    items : 처리할 항목 목록
+    fn : 항목 하나를 받아 결과를 리턴하는 코루틴 함수
+    concurrency : 동시에 실행할 최대 개수
+    timeout : 항목 하나의 최대 처리 시간 (초)
+    name : 로그에 표시할 작업 이름
+    """
+    items = list(items)
+    result = FanOutResult(len(items))
+    pending = iter(range(len(items)))
+    started = time.perf_counter()
+
+    async def worker():
+        for i in pending:
+            try:
+                result.results[i] = await asyncio.wait_for(fn(items[i]), timeout)
+                if result.results[i] is None:
+                    result.failed += 1
+                else:
+                    result.succeeded += 1
+            except asyncio.TimeoutError:
+                result.timed_out += 1
+            except asyncio.CancelledError:
+                # Python 3.7에서는 CancelledError도 Exception이므로 실패로 세지 않고 전달합니다.
+                raise
+            except Exception as e:
+                logger.debug("{} failed for {}: {}", name, items[i], e)
+                result.failed += 1
+
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, len(items)))])
+
+    result.elapsed = time.perf_counter() - started
+    logger.info("{}: {}/{} succeeded ({} failed, {} timed out) in {:.2f}s.",
+        name, result.succeeded, result.total, result.failed, result.timed_out, result.elapsed)
+    return result
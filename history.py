@@ -0,0 +1,150 @@
+import os
+import mmap
+import struct
+import statistics
+from array import array
+from datetime import datetime, timedelta
+
+import logger
+
+
+KST = 9 * 60 * 60
+DAY = 24 * 60 * 60
+
+
+class PriceHistory:
+    """
+    아이템별 경매장 시세(최저가, 중간값, 수량)를 고정 길이 레코드로 파일에 이어 붙이고,
+    조회할 때는 파일을 메모리 맵(mmap)으로 읽습니다. 몇 달치 기록을 메모리에 올리지 않고
+    아이템 ID별 레코드 위치 인덱스만 메모리에 둡니다.
+    오래된 시간 단위 레코드는 compact()로 하루 단위 레코드 하나로 합칩니다.
+
+    레코드 형식: 시각(초), 아이템 ID, 최저가, 중간값, 수량, 기간(시간)
+
+    Parameters
+    ---
+    path : 기록 파일 경로
+    """
+    RECORD = struct.Struct("<IIqqIH")
+
+    def __init__(self, path):
+        self.path = path
+        self._load()
+
+    def __len__(self):
+        return 0 if self._map is None else len(self._map) // self.RECORD.size
+
+    def _load(self):
+        # 새 맵과 인덱스를 모두 만든 뒤 한 번에 바꾸므로, 다른 스레드에서 기록을 추가하는
+        # 도중에도 조회는 이전 맵과 인덱스로 일관되게 이루어집니다.
+        index, oldest_hourly, mapped = dict(), None, None
+        self._stamp = _stamp(self.path)
+        if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            for n, record in enumerate(self.RECORD.iter_unpack(mapped)):
+                timestamp, item_id, _, _, _, span = record
+                if item_id not in index:
+                    index[item_id] = array("I")
+                index[item_id].append(n)
+                if span == 1 and (oldest_hourly is None or timestamp < oldest_hourly):
+                    oldest_hourly = timestamp
+        self._map, self._index, self._oldest_hourly = mapped, index, oldest_hourly
+
+    def reload(self):
+        """
+        다른 프로세스가 기록 파일을 바꿨다면 다시 읽습니다. 여러 프로세스로 실행할 때는
+        한 프로세스만 기록을 추가하고, 나머지는 이 메서드로 바뀐 기록을 읽어 옵니다.
+        """
+        if _stamp(self.path) != self._stamp:
+            self._load()
+
+    def _records(self, item_id):
+        mapped, index = self._map, self._index
+        for n in index.get(item_id, ()):
+            yield self.RECORD.unpack_from(mapped, n * self.RECORD.size)
+
+    def append(self, timestamp, snapshot):
+        """경매장 스냅샷의 모든 아이템 시세를 timestamp(초) 시각의 레코드로 추가합니다."""
+        records = list()
+        for item_id in snapshot.items():
+            res = snapshot.price_stats(item_id, percentiles=(50,))
+            if res["min"] is None:
+                continue
+            records.append(self.RECORD.pack(
+                int(timestamp), item_id, res["min"], res["percentiles"][50],
+                res["quantity"], 1))
+
+        with open(self.path, "ab") as f:
+            f.write(b"".join(records))
+        self._load()
+        logger.debug("Appended {} price records to '{}'.", len(records), self.path)
+
+    def query(self, item_id, since):
+        """
+        since(초)가 속한 날(한국 시간)부터의 아이템 레코드를 (시각, 최저가, 중간값, 수량, 기간)
+        목록으로 리턴합니다. compact()로 합친 레코드는 그날 0시로 기록되므로, since를 그날
+        0시로 내려야 첫날의 레코드가 빠지지 않습니다.
+        """
+        since = (int(since) + KST) // DAY * DAY - KST
+        return [(r[0], r[2], r[3], r[4], r[5])
+                for r in self._records(item_id) if r[0] >= since]
+
+    def daily(self, item_id, since):
+        """since(초)가 속한 날부터의 아이템 시세를 한국 시간 기준 하루 단위로 묶어 리턴합니다."""
+        buckets = dict()
+        for record in self.query(item_id, since):
+            day = (record[0] + KST) // DAY * DAY - KST
+            buckets.setdefault(day, []).append(record)
+        return [(day,) + _merge(buckets[day]) for day in sorted(buckets)]
+
+    def compact(self, before):
+        """
+        before(초) 이전의 시간 단위 레코드를 한국 시간 기준 하루 단위 레코드로 합칩니다.
+        최저가는 그날의 최저값, 중간값은 시간별 중간값의 중간값, 수량은 평균을 사용합니다.
+        """
+        before = (int(before) + KST) // DAY * DAY - KST
+        if self._oldest_hourly is None or self._oldest_hourly >= before:
+            return
+
+        kept, buckets = list(), dict()
+        for record in self.RECORD.iter_unpack(self._map):
+            timestamp, item_id, low, median, quantity, span = record
+            if span == 1 and timestamp < before:
+                day = (timestamp + KST) // DAY * DAY - KST
+                buckets.setdefault((day, item_id), []).append(
+                    (timestamp, low, median, quantity, span))
+            else:
+                kept.append(record)
+        for (day, item_id), records in buckets.items():
+            low, median, quantity = _merge(records)
+            kept.append((day, item_id, low, median, quantity, 24))
+        kept.sort(key=lambda r: r[0])
+
+        temp = "{}.tmp".format(self.path)
+        with open(temp, "wb") as f:
+            f.write(b"".join(self.RECORD.pack(*r) for r in kept))
+        os.replace(temp, self.path)
+        self._load()
+        logger.info("Compacted price history before {}.",
+            (datetime.utcfromtimestamp(before) + timedelta(seconds=KST)).strftime("%Y-%m-%d"))
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _merge(records):
+    return (
+        min(r[1] for r in records),
+        int(statistics.median(r[2] for r in records)),
+        int(sum(r[3] for r in records) / len(records)))
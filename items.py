@@ -0,0 +1,146 @@
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import logger
+
+
+class ItemStore:
+    """
+    아이템 정보(이름, 등급, 레벨)를 SQLite 파일에 저장하고, 최근에 읽은 정보는 메모리에도
+    최대 max_hot개까지 보관합니다. 아이템 정보는 패치 전까지 바뀌지 않으므로 max_age(초)가
+    지나기 전에는 API를 다시 호출하지 않으며, 메모리에 보관한 정보도 저장된 지 max_age가
+    지나면 버립니다. 파일은 처음 사용할 때 엽니다.
+    받아오지 못한 아이템은 retry_after(초) 동안 missing()에서 빼므로, 항상 실패하는 아이템을
+    매번 다시 요청하지 않습니다. 이벤트 루프를 멈추지 않도록 executor에서 호출할 수 있으며,
+    모든 메서드는 잠금으로 보호됩니다.
+
+    Parameters
+    ---
+    path : SQLite 파일 경로
+    max_age : 저장된 아이템 정보를 유효하다고 볼 시간 (초)
+    max_hot : 메모리에 보관할 최대 아이템 수
+    retry_after : 받아오지 못한 아이템을 다시 요청하기까지의 시간 (초)
+    """
+    QUERY_BATCH = 500
+
+    def __init__(self, path, max_age=30 * 24 * 60 * 60, max_hot=10000, retry_after=24 * 60 * 60):
+        self.path = path
+        self.max_age = max_age
+        self.max_hot = max_hot
+        self.retry_after = retry_after
+        self._hot = OrderedDict()
+        self._failed = dict()
+        self._connection = None
+        self._lock = threading.RLock()
+
+    @property
+    def _db(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY, name TEXT NOT NULL, quality TEXT, "
+                "level INTEGER, updated INTEGER NOT NULL)")
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS items_name ON items (name COLLATE NOCASE)")
+            self._connection.commit()
+        return self._connection
+
+    def __contains__(self, item_id):
+        return self.get(item_id) is not None
+
+    def get(self, item_id):
+        with self._lock:
+            hot = self._hot.get(item_id)
+            if hot is not None:
+                item, updated = hot
+                if updated > time.time() - self.max_age:
+                    self._hot.move_to_end(item_id)
+                    return item
+                del self._hot[item_id]
+            row = self._db.execute(
+                "SELECT id, name, quality, level, updated FROM items WHERE id = ? AND updated > ?",
+                (item_id, int(time.time()) - self.max_age)).fetchone()
+            if row is None:
+                return None
+            return self._remember(_to_item(row), row[4])
+
+    def _remember(self, item, updated):
+        self._hot[item["id"]] = (item, updated)
+        self._hot.move_to_end(item["id"])
+        while len(self._hot) > self.max_hot:
+            self._hot.popitem(last=False)
+        return item
+
+    def find(self, name):
+        """이름이 일치하는 아이템 ID를 리턴합니다. 대소문자는 구분하지 않습니다."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM items WHERE name = ? COLLATE NOCASE ORDER BY level DESC LIMIT 1",
+                (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def missing(self, item_ids):
+        """
+        저장되어 있지 않거나 max_age가 지난 아이템 ID 목록을 리턴합니다. 여러 ID를 한 번의
+        쿼리로 확인하며, 메모리에 보관한 정보의 LRU 순서는 바꾸지 않습니다.
+        retry_after 안에 받아오지 못한 아이템은 빼고, 전에 실패한 적이 있는 아이템은 처음
+        요청하는 아이템 뒤에 오래전에 실패한 순서로 둡니다.
+        """
+        now, cutoff = time.time(), int(time.time()) - self.max_age
+        with self._lock:
+            unknown = [i for i in dict.fromkeys(item_ids)
+                       if i not in self._hot or self._hot[i][1] <= cutoff]
+            found = set()
+            for start in range(0, len(unknown), self.QUERY_BATCH):
+                batch = unknown[start:start + self.QUERY_BATCH]
+                found.update(r[0] for r in self._db.execute(
+                    "SELECT id FROM items WHERE updated > ? AND id IN ({})".format(
+                        ",".join("?" * len(batch))),
+                    [cutoff] + batch))
+            failed = self._failed
+            missing = [i for i in unknown
+                       if i not in found and now - failed.get(i, 0) > self.retry_after]
+        missing.sort(key=lambda i: failed.get(i, 0))
+        return missing
+
+    def mark_failed(self, item_ids):
+        """받아오지 못한 아이템을 기록해 retry_after 동안 missing()에서 뺍니다."""
+        now = time.time()
+        with self._lock:
+            for i in item_ids:
+                self._failed[i] = now
+
+    def put_many(self, items):
+        """API에서 받은 아이템 데이터 목록을 저장합니다."""
+        now = int(time.time())
+        rows = list()
+        with self._lock:
+            for item in items:
+                row = (item["id"], item["name"], item.get("quality", {}).get("type"),
+                       item.get("level"))
+                self._remember(_to_item(row), now)
+                self._failed.pop(item["id"], None)
+                rows.append(row + (now,))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO items (id, name, quality, level, updated) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+        logger.debug("Stored {} items.", len(rows))
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _to_item(row):
+    return {
+        "id": row[0],
+        "name": row[1],
+        "quality": row[2],
+        "level": row[3],
+    }
@@ -0,0 +1,123 @@
+"""
+Discord 샤드를 여러 워커 프로세스에 나누어 봇을 실행합니다. 프로세스마다 이벤트 루프가
+따로 있으므로 게이트웨이 처리, JSON 해석, embed 생성이 여러 코어에 나뉘며, 워커들은
+cache_shared 설정의 SQLite 파일로 API 응답 캐시를 공유합니다.
+워커가 비정상적으로 종료되면 다시 실행합니다.
+
+    python launcher.py --workers 4 --shards 8
+"""
+import sys
+import time
+import signal
+import asyncio
+import argparse
+import multiprocessing
+import aiohttp
+
+import config
+import logger
+import decoder
+
+
+RESTART_DELAY = 5
+
+
+def worker(index, workers, shard_ids, shard_count):
+    """워커 프로세스의 진입점입니다. bot을 import하기 전에 샤드 설정을 덮어씁니다."""
+    overrides = {
+        "shard_ids": ",".join(str(i) for i in shard_ids),
+        "shard_count": str(shard_count),
+        "shard_workers": str(workers),
+        "shard_primary": "true" if index == 0 else "false",
+        "logger_filename": "logs-{}.txt".format(index),
+    }
+    if config.get("metrics_port", "") != "":
+        overrides["metrics_port"] = str(int(config.get("metrics_port")) + index)
+    config._CONFIG_DATA.update(overrides)
+
+    import bot
+    bot.main()
+
+
+async def recommended_shards(token):
+    """Discord가 권장하는 샤드 수를 받아옵니다."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+                "https://discord.com/api/v8/gateway/bot",
+                headers={"Authorization": "Bot {}".format(token)}) as response:
+            if response.status != 200:
+                return None
+            return decoder.loads(await response.read())["shards"]
+
+
+def assign(shard_count, workers):
+    """샤드 번호를 워커마다 최대한 고르게 나눕니다."""
+    return [list(range(i, shard_count, workers)) for i in range(workers)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드를 여러 프로세스로 나누어 봇을 실행합니다")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="워커 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="전체 샤드 수 (기본값: Discord 권장값)")
+    args = parser.parse_args()
+
+    token = config.get("discord_token")
+    if token is None:
+        logger.error("Failed to get discord token.")
+        return 1
+
+    shard_count = args.shards
+    if shard_count is None:
+        shard_count = asyncio.get_event_loop().run_until_complete(recommended_shards(token))
+        if shard_count is None:
+            logger.error("Failed to get recommended shard count from discord.")
+            return 1
+    workers = max(1, min(args.workers, shard_count))
+    if config.get("cache_shared", "") == "":
+        logger.warning("cache_shared is not set; workers will not share responses.")
+
+    context = multiprocessing.get_context("spawn")
+    assignments = assign(shard_count, workers)
+    processes = [None] * workers
+    stopping = False
+
+    def start(index):
+        process = context.Process(
+            target=worker, args=(index, workers, assignments[index], shard_count),
+            name="shard-worker-{}".format(index))
+        process.start()
+        processes[index] = process
+        logger.info("Started worker {} (pid {}) with shards {}.",
+            index, process.pid, assignments[index])
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for i in range(workers):
+        start(i)
+    while not stopping:
+        time.sleep(1)
+        for i, process in enumerate(processes):
+            if not process.is_alive() and not stopping:
+                logger.error("Worker {} exited with code {}; restarting in {}s.",
+                    i, process.exitcode, RESTART_DELAY)
+                time.sleep(RESTART_DELAY)
+                start(i)
+
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+    logger.info("Stopped all workers.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
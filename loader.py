@@ -0,0 +1,43 @@
+import asyncio
+
+from raider import Raider
+from blizzard import Blizzard
+
+
+class CharacterLoader:
+    """
+    명령어 하나를 처리하는 동안 사용하는 캐릭터 데이터 로더입니다.
+    명령어가 필요한 리소스를 한 번에 요청하면 모두 동시에 불러오므로, 응답 시간은 각
+    요청 시간의 합이 아니라 가장 느린 요청의 시간이 됩니다. 같은 리소스를 여러 번
+    요청해도 실제로는 한 번만 불러옵니다.
+
+    Parameters
+    ---
+    realm_name : 서버 이름
+    character_name : 캐릭터 이름
+    """
+    RESOURCES = {
+        "profile": Blizzard.get_character,
+        "items": Blizzard.get_character_items,
+        "media": Blizzard.get_character_media,
+        "talents": Blizzard.get_character_talents,
+        "raider": Raider.get_character,
+    }
+
+    def __init__(self, realm_name, character_name):
+        self.realm_name = realm_name
+        self.character_name = character_name
+        self._futures = dict()
+
+    def _future(self, resource):
+        if resource not in self._futures:
+            self._futures[resource] = asyncio.ensure_future(
+                self.RESOURCES[resource](self.realm_name, self.character_name))
+        return self._futures[resource]
+
+    async def get(self, resource):
+        return await self._future(resource)
+
+    async def load(self, *resources):
+        """요청한 리소스들을 동시에 불러와 요청한 순서대로 리턴합니다."""
+        return await asyncio.gather(*[self._future(r) for r in resources])
@@ -1,7 +1,9 @@
 from __future__ import absolute_import
 
-import os
+import queue
+import atexit
 import logging as _logging
+from logging import handlers as _handlers
 from threading import Lock
 
 import config
@@ -9,6 +11,7 @@ import config
 
 _logger = None
 _logger_level = _logging.INFO
+_listener = None
 
 _logger_lock = Lock()
 
@@ -20,36 +23,82 @@ LOG_LEVEL_NAMES = {
 }
 
 
+class _Message:
+    """
+    '{}' 형식의 메시지와 인자를 함께 들고 있다가, 실제로 출력할 때 문자열로 만듭니다.
+    출력하지 않는 레벨의 메시지는 문자열로 만들지 않으며, 출력하는 메시지도 이벤트 루프가
+    아니라 로그를 기록하는 스레드에서 만들어집니다.
+    """
+    __slots__ = ("msg", "args")
+
+    def __init__(self, msg, args):
+        self.msg = msg
+        self.args = args
+
+    def __str__(self):
+        return self.msg.format(*self.args) if self.args else self.msg
+
+
+class _QueueHandler(_handlers.QueueHandler):
+    """
+    기록을 포맷하지 않고 그대로 큐에 넣습니다. 기본 QueueHandler는 큐에 넣기 전에
+    호출한 스레드에서 메시지를 만드므로, 포맷은 QueueListener 스레드에 맡깁니다.
+    """
+    def prepare(self, record):
+        return record
+
+
 def _get_logger():
-    global _logger
+    global _logger, _logger_level, _listener
 
     if _logger:
         return _logger
 
     _logger_lock.acquire()
     try:
+        if _logger:
+            return _logger
         logger = _logging.getLogger("wow-discord-bot")
 
-        logger.setLevel(_logger_level)
-        logger_level = config.get("logger_loglevel").upper()
+        logger_level = config.get("logger_loglevel", "info").upper()
         for k, v in LOG_LEVEL_NAMES.items():
             if v == logger_level:
-                logger.setLevel(k)
+                _logger_level = k
+        logger.setLevel(_logger_level)
+        logger.propagate = False
 
         formatter = _logging.Formatter("[%(levelname)s] %(message)s")
         streamHandler = _logging.StreamHandler()
         streamHandler.setFormatter(formatter)
-        logger.addHandler(streamHandler)
+        outputs = [streamHandler]
         if config.get("logger_filelog") == "true":
-            fileHandler = _logging.FileHandler("logs.txt")
+            fileHandler = _handlers.RotatingFileHandler(
+                config.get("logger_filename", "logs.txt"),
+                maxBytes=int(config.get("logger_max_bytes", 10 * 1024 * 1024)),
+                backupCount=int(config.get("logger_backups", 5)),
+                encoding="utf-8")
             fileHandler.setFormatter(formatter)
-            logger.addHandler(fileHandler)
-        
+            outputs.append(fileHandler)
+
+        # 이벤트 루프에서는 기록을 큐에 넣기만 하고, 포맷과 출력은 별도 스레드에서 합니다.
+        records = queue.SimpleQueue()
+        logger.addHandler(_QueueHandler(records))
+        _listener = _handlers.QueueListener(records, *outputs, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop)
+
         _logger = logger
         return _logger
     finally:
         _logger_lock.release()
 
+def stop():
+    """큐에 남은 기록을 모두 출력하고 로그 스레드를 멈춥니다."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 def lname_to_level(lname):
     for l in LOG_LEVEL_NAMES:
         if lname.upper() == LOG_LEVEL_NAMES[l]:
@@ -61,14 +110,25 @@ def level_to_lname(level):
         return LOG_LEVEL_NAMES[level]
     return None
 
-def debug(msg):
-    _get_logger().debug(msg)
+def enabled(level):
+    """
+    level의 로그가 출력되는지 확인합니다. 인자를 만드는 것 자체가 비싼 로그는 이 함수로
+    먼저 확인합니다.
+    """
+    _get_logger()
+    return level >= _logger_level
+
+def debug(msg, *args):
+    # debug 로그는 가장 자주 불리므로, 출력하지 않을 때는 기록 객체도 만들지 않습니다.
+    if _logger is not None and _logger_level > _logging.DEBUG:
+        return
+    _get_logger().debug(_Message(msg, args))
 
-def info(msg):
-    _get_logger().info(msg)
+def info(msg, *args):
+    _get_logger().info(_Message(msg, args))
 
-def warning(msg):
-    _get_logger().warning(msg)
+def warning(msg, *args):
+    _get_logger().warning(_Message(msg, args))
 
-def error(msg):
-    _get_logger().error(msg)
+def error(msg, *args):
+    _get_logger().error(_Message(msg, args))
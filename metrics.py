@@ -0,0 +1,155 @@
+import time
+import bisect
+from aiohttp import web
+
+import logger
+import client
+import tracing
+from decorators import CommandCache
+
+
+class Histogram:
+    """Prometheus 형식의 누적 버킷 히스토그램입니다. 값의 단위는 초입니다."""
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """q 분위수가 속한 버킷의 상한을 리턴합니다. 마지막 버킷이면 inf입니다."""
+        if self.count == 0:
+            return None
+        target, cumulative = q * self.count, 0
+        for bound, count in zip(self.BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+
+command_latency = dict()
+command_errors = dict()
+commands_in_flight = 0
+
+
+def command_started(name):
+    global commands_in_flight
+    commands_in_flight += 1
+    return time.perf_counter()
+
+
+def command_finished(name, started, failed=False):
+    global commands_in_flight
+    commands_in_flight -= 1
+    if name not in command_latency:
+        command_latency[name] = Histogram()
+    command_latency[name].observe(time.perf_counter() - started)
+    if failed:
+        command_errors[name] = command_errors.get(name, 0) + 1
+
+
+def _labels(**labels):
+    def escape(v):
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join('{}="{}"'.format(k, escape(v)) for k, v in labels.items()) + "}"
+
+
+def render():
+    """모든 지표를 Prometheus text exposition 형식으로 리턴합니다."""
+    lines = list()
+
+    def metric(name, kind, description, samples):
+        lines.append("# HELP {} {}".format(name, description))
+        lines.append("# TYPE {} {}".format(name, kind))
+        for labels, value in samples:
+            lines.append("{}{} {}".format(name, labels, value))
+
+    def histogram(name, description, histograms):
+        lines.append("# HELP {} {}".format(name, description))
+        lines.append("# TYPE {} histogram".format(name))
+        for labels, h in histograms:
+            cumulative = 0
+            for bound, count in zip(h.BUCKETS + ("+Inf",), h.counts):
+                cumulative += count
+                lines.append("{}_bucket{} {}".format(name, _labels(**dict(labels, le=bound)), cumulative))
+            lines.append("{}_sum{} {}".format(name, _labels(**labels), h.sum))
+            lines.append("{}_count{} {}".format(name, _labels(**labels), h.count))
+
+    clients = client.HttpClient._clients
+
+    histogram("wow_command_latency_seconds", "Command handling time.",
+              [({"command": k}, h) for k, h in command_latency.items()])
+    histogram("wow_upstream_latency_seconds", "Upstream request time.",
+              [({"upstream": u, "endpoint": e}, h) for (u, e), h in tracing.latency.items()])
+
+    metric("wow_command_errors_total", "counter", "Commands that raised an error.",
+           [(_labels(command=k), v) for k, v in command_errors.items()])
+    metric("wow_commands_in_flight", "gauge", "Commands currently being handled.",
+           [("", commands_in_flight)])
+
+    metric("wow_upstream_responses_total", "counter", "Upstream responses by status.",
+           [(_labels(upstream=c.name, status=s), n)
+            for c in clients for s, n in c.responses.items()])
+    metric("wow_upstream_in_flight", "gauge", "Upstream requests currently in flight.",
+           [(_labels(upstream=c.name), c.in_flight) for c in clients])
+    metric("wow_upstream_coalesced_total", "counter", "Calls served by an in-flight request.",
+           [(_labels(upstream=c.name), c.stats["coalesced"]) for c in clients])
+    metric("wow_upstream_not_modified_total", "counter", "Cached responses revalidated by 304.",
+           [(_labels(upstream=c.name), c.stats["not_modified"]) for c in clients])
+    metric("wow_upstream_decode_seconds_total", "counter", "Time spent decoding JSON responses.",
+           [(_labels(upstream=c.name, endpoint=e), d[1])
+            for c in clients for e, d in c.decoding.items()])
+    metric("wow_upstream_decoded_bytes_total", "counter", "Bytes of JSON responses decoded.",
+           [(_labels(upstream=c.name, endpoint=e), d[2])
+            for c in clients for e, d in c.decoding.items()])
+    metric("wow_ratelimit_queued", "gauge", "Requests waiting for the rate limiter.",
+           [(_labels(upstream=c.name), c.limiter.queued) for c in clients])
+    metric("wow_ratelimit_wait_seconds_total", "counter", "Time spent waiting for the rate limiter.",
+           [(_labels(upstream=c.name), c.limiter.stats["wait_time"]) for c in clients])
+    metric("wow_ratelimit_throttled_total", "counter", "429 responses from upstream.",
+           [(_labels(upstream=c.name), c.limiter.stats["throttled"]) for c in clients])
+
+    caches = [("response_" + c.name, c.cache) for c in clients] \
+        + [("command_" + c.name, c) for c in CommandCache.caches]
+    for event in ["hits", "misses", "evictions"]:
+        metric("wow_cache_{}_total".format(event), "counter", "Cache {}.".format(event),
+               [(_labels(cache=n), c.stats[event]) for n, c in caches])
+    metric("wow_cache_entries", "gauge", "Entries in each cache.",
+           [(_labels(cache=n), len(c)) for n, c in caches])
+    metric("wow_cache_bytes", "gauge", "Bytes held by each response cache.",
+           [(_labels(cache="response_" + c.name), c.cache.size) for c in clients])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    render() 결과를 /metrics 경로로 제공하는 로컬 HTTP 서버입니다.
+    모니터링 서버가 수집(scrape)할 수 있도록 설정한 포트에서만 실행됩니다.
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._runner = None
+
+    async def _handle(self, request):
+        return web.Response(text=render(), content_type="text/plain")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info("Serving metrics on http://{}:{}/metrics", self.host, self.port)
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
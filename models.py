@@ -0,0 +1,149 @@
+"""
+캐릭터 API 응답에서 명령어가 실제로 사용하는 값만 골라 담는 모델입니다. 응답을 해석할 때
+한 번만 만들어 캐시에 저장하고 모든 명령어가 같은 객체를 함께 사용하므로, 만든 뒤에는
+값을 바꾸지 않아야 합니다. 원본 JSON 전체를 보관하지 않고 __slots__를 사용하므로 캐시된
+캐릭터 하나가 차지하는 메모리가 훨씬 작습니다.
+슬롯 종류처럼 여러 캐릭터에 반복되는 짧은 문자열은 sys.intern()으로 하나만 보관합니다.
+"""
+import sys
+
+
+def _intern(value):
+    return None if value is None else sys.intern(value)
+
+
+class CharacterProfile:
+    """
+    캐릭터 정보 (/wow/character, fields=items,stats,guild,progression)
+
+    raid_kills는 가장 최근 레이드의 우두머리별 (일반, 영웅, 신화) 처치 횟수입니다.
+    """
+    __slots__ = ("name", "guild", "race", "class_id", "faction", "thumbnail",
+                 "average_item_level", "average_item_level_equipped",
+                 "azerite_level", "neck_item_level",
+                 "crit", "haste", "mastery", "versatility",
+                 "raid_name", "raid_kills", "last_modified")
+
+    def __init__(self, data):
+        items, stats = data["items"], data["stats"]
+        neck = items.get("neck", {})
+        raid = data["progression"]["raids"][-1] if len(data["progression"]["raids"]) > 0 else None
+
+        self.name = data["name"]
+        self.guild = data["guild"]["name"] if "guild" in data else None
+        self.race = data["race"]
+        self.class_id = data["class"]
+        self.faction = data["faction"]
+        self.thumbnail = data["thumbnail"]
+        self.average_item_level = items["averageItemLevel"]
+        self.average_item_level_equipped = items["averageItemLevelEquipped"]
+        self.azerite_level = neck.get("azeriteItem", {}).get("azeriteLevel", 0)
+        self.neck_item_level = neck.get("itemLevel", 0)
+        self.crit = stats["crit"]
+        self.haste = stats["haste"]
+        self.mastery = stats["mastery"]
+        self.versatility = stats["versatilityDamageDoneBonus"]
+        self.raid_name = None if raid is None else raid["name"]
+        self.raid_kills = () if raid is None else tuple(
+            (b["normalKills"], b["heroicKills"], b["mythicKills"]) for b in raid["bosses"])
+        self.last_modified = data.get("lastModified")
+
+
+class EquippedItem:
+    """
+    착용 중인 아이템 하나입니다. azerite_powers는 선택한 아제라이트 특성의 (단계, 이름),
+    essences는 선택한 정수의 (칸, 이름, 등급) 목록입니다.
+    """
+    __slots__ = ("slot", "slot_name", "inventory_type", "level", "item_id", "name",
+                 "transmog_id", "transmog_name", "azerite_powers", "essences")
+
+    def __init__(self, data):
+        transmog = data.get("transmog", {}).get("item")
+        azerite = data.get("azerite_details", {})
+
+        self.slot = _intern(data["slot"]["type"])
+        self.slot_name = _intern(data["slot"]["name"])
+        self.inventory_type = _intern(data["inventory_type"]["name"])
+        self.level = data["level"]["value"]
+        self.item_id = data["item"]["id"]
+        self.name = data["name"]
+        self.transmog_id = None if transmog is None else transmog["id"]
+        self.transmog_name = None if transmog is None else transmog["name"]
+        self.azerite_powers = tuple(
+            (p["tier"], p["spell_tooltip"]["spell"]["name"])
+            for p in azerite.get("selected_powers", ()) if "spell_tooltip" in p)
+        self.essences = tuple(
+            (e["slot"], e["essence"]["name"], e["rank"])
+            for e in azerite.get("selected_essences", ()) if "essence" in e)
+
+
+class Equipment:
+    """착용 중인 아이템 목록 (/profile/wow/character/.../equipment)"""
+    __slots__ = ("items",)
+
+    def __init__(self, data):
+        self.items = tuple(EquippedItem(i) for i in data["equipped_items"])
+
+
+class CharacterMedia:
+    """캐릭터 이미지 주소 (/profile/wow/character/.../character-media)"""
+    __slots__ = ("avatar_url", "render_url")
+
+    def __init__(self, data):
+        self.avatar_url = data.get("avatar_url")
+        self.render_url = data.get("render_url")
+
+
+class Talent:
+    __slots__ = ("tier", "column", "name", "description")
+
+    def __init__(self, data):
+        self.tier = data["tier"]
+        self.column = data["column"]
+        self.name = data["spell"]["name"]
+        self.description = data["spell"]["description"]
+
+
+class TalentSpec:
+    """전문화 하나와 그 전문화에서 선택한 특성입니다. selected는 현재 전문화인지 여부입니다."""
+    __slots__ = ("name", "selected", "talents")
+
+    def __init__(self, data):
+        self.name = _intern(data["spec"]["name"])
+        self.selected = data.get("selected", False)
+        self.talents = tuple(Talent(t) for t in data["talents"])
+
+
+class CharacterTalents:
+    """캐릭터 특성 (/wow/character, fields=talents). 전문화가 없는 항목은 버립니다."""
+    __slots__ = ("faction", "class_id", "specs")
+
+    def __init__(self, data):
+        self.faction = data["faction"]
+        self.class_id = data["class"]
+        self.specs = tuple(TalentSpec(t) for t in data["talents"] if "spec" in t)
+
+
+class MythicRun:
+    __slots__ = ("dungeon", "mythic_level", "upgrades")
+
+    def __init__(self, data):
+        self.dungeon = _intern(data["dungeon"])
+        self.mythic_level = data["mythic_level"]
+        self.upgrades = data["num_keystone_upgrades"]
+
+
+class RaiderProfile:
+    """
+    Raider.IO 캐릭터 정보 (/characters/profile). weekly_best는 이번주 최고 쐐기 던전
+    기록이며, 없으면 None입니다.
+    """
+    __slots__ = ("name", "score", "weekly_best")
+
+    def __init__(self, data):
+        runs = data.get("mythic_plus_weekly_highest_level_runs", [])
+        seasons = data.get("mythic_plus_scores_by_season", [])
+
+        self.name = data["name"]
+        self.score = seasons[0]["scores"]["all"] if len(seasons) > 0 else 0
+        self.weekly_best = MythicRun(runs[0]) if len(runs) > 0 else None
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from utils import encode
+import logger
+import config
+
+
+class TokenManager:
+    """
+    OAuth client credentials 토큰을 발급받고 만료되기 전에 미리 갱신합니다.
+    발급 응답의 expires_in을 기억해 두었다가 만료 margin초 전에 백그라운드에서 새 토큰을
+    받아오므로, 명령어를 처리하는 도중에는 토큰 발급을 기다리지 않습니다.
+    여러 요청이 동시에 갱신을 시도하더라도 실제 발급 요청은 하나만 보내고 나머지는
+    그 결과를 함께 기다립니다.
+
+    Parameters
+    ---
+    client : 토큰 발급에 사용할 HttpClient
+    url : 토큰 발급 URL
+    client_id : 클라이언트 ID
+    client_secret : 클라이언트 secret
+    margin : 만료 몇 초 전에 갱신할지 (초)
+    """
+    RETRY_DELAY = 30
+
+    def __init__(self, client, url, client_id, client_secret, margin=300):
+        self._client = client
+        self._url = url
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._margin = margin
+        self._token = None
+        self._expires_at = 0
+        self._refreshing = None
+        self._task = None
+
+    @property
+    def valid(self):
+        return self._token is not None and time.monotonic() < self._expires_at
+
+    async def get(self):
+        if self.valid:
+            return self._token
+        return await self.refresh()
+
+    async def refresh(self):
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._fetch())
+        return await asyncio.shield(self._refreshing)
+
+    def invalidate(self, token):
+        """서버에서 거부된 토큰을 만료 처리합니다. 이미 새 토큰으로 바뀌었다면 무시합니다."""
+        if token == self._token:
+            self._expires_at = 0
+
+    async def _fetch(self):
+        query = "?grant_type=client_credentials&client_id={}&client_secret={}".format(
+            self._client_id, self._client_secret)
+        url = encode(self._url, query)
+
+        try:
+            async with self._client.get(url, endpoint="token") as response:
+                token = None
+                if response.status == 200:
+                    token = self._client.decode(await response.read(), "token")
+                if token is not None:
+                    self._token = token["access_token"]
+                    self._expires_at = time.monotonic() + int(token["expires_in"])
+                    logger.info("Changed the access token for {} API.", self._client.name)
+                    return self._token
+                logger.error("Failed to change the access token for {} API.", self._client.name)
+                return None
+        except Exception as e:
+            logger.error("Failed to change the access token for {} API: {}", self._client.name, e)
+            return None
+        finally:
+            self._refreshing = None
+
+    async def _run(self):
+        while True:
+            remaining = self._expires_at - time.monotonic() - self._margin
+            delay = remaining if self.valid and remaining > 0 else self.RETRY_DELAY
+            await asyncio.sleep(delay)
+            await self.refresh()
+
+    async def start(self):
+        await self.refresh()
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
@@ -1,3 +1,7 @@
+import re
+import bisect
+
+
 class COLOR:
     GRAY = 0xAAAAAA
     RED = 0xFF7777
@@ -18,89 +22,139 @@ class GAME_ICON:
 
 class REALM:
     _realms = dict()
+    _slugs = dict()
+    _normalized = dict()
+    _sorted = list()
+    _deletes = dict()
+
+    @classmethod
+    def load(cls, realms):
+        """
+        서버 표(한글 이름: 영문 slug)를 교체하고 조회용 인덱스를 만듭니다.
+        한글 이름과 slug의 정규화된 형태, 접두어 검색용 정렬 목록, 오타(한 글자 차이)
+        검색용 삭제 변형 인덱스를 미리 만들어 두므로 조회할 때 전체를 훑지 않습니다.
+        """
+        slugs = {v: k for k, v in realms.items()}
+        normalized = dict()
+        for k, v in realms.items():
+            normalized[_normalize(k)] = k
+            normalized[_normalize(v)] = k
+        deletes = dict()
+        for n in normalized:
+            for d in _deletions(n):
+                deletes.setdefault(d, set()).add(normalized[n])
+        cls._realms, cls._slugs, cls._normalized, cls._deletes = \
+            dict(realms), slugs, normalized, deletes
+        cls._sorted = sorted(normalized)
+
+    @classmethod
+    def resolve(cls, name):
+        """
+        입력한 서버 이름을 한글 서버 이름으로 바꿉니다. 한글 이름, 영문 slug, 대소문자나
+        띄어쓰기가 다른 이름, 유일한 접두어, 한 글자 오타를 순서대로 확인하며, 후보가
+        여러 개이거나 없으면 None을 리턴합니다.
+        """
+        if name is None:
+            return None
+        if name in cls._realms:
+            return name
+        if name in cls._slugs:
+            return cls._slugs[name]
+
+        key = _normalize(name)
+        if len(key) == 0:
+            return None
+        if key in cls._normalized:
+            return cls._normalized[key]
+
+        if len(key) >= 2:
+            i = bisect.bisect_left(cls._sorted, key)
+            found = set()
+            while i < len(cls._sorted) and cls._sorted[i].startswith(key):
+                found.add(cls._normalized[cls._sorted[i]])
+                i += 1
+            if len(found) == 1:
+                return found.pop()
+
+        found = set()
+        for d in _deletions(key):
+            found |= cls._deletes.get(d, set())
+        if len(found) == 1:
+            return found.pop()
+        return None
 
     @classmethod
     def exists(cls, name):
-        if name in cls._realms or name in cls._realms.values():
-            return True
-        return False
+        return cls.resolve(name) is not None
 
     @classmethod
     def KR(cls, arg):
-        if arg in cls._realms:
-            return arg
-        for k, v in cls._realms.items():
-            if v == arg:
-                return k
-        return None
+        return cls.resolve(arg)
 
     @classmethod
     def EN(cls, arg):
-        if arg in cls._realms.values():
-            return arg
-        if arg in cls._realms:
-            return cls._realms[arg]
-        return None
+        name = cls.resolve(arg)
+        return None if name is None else cls._realms[name]
 
 class RACE:
     _races = dict()
+    _ids = dict()
+
+    @classmethod
+    def load(cls, races):
+        cls._races, cls._ids = dict(races), {v: k for k, v in races.items()}
 
     @classmethod
     def ID(cls, arg):
-        if arg in _races:
+        if arg in cls._races:
             return arg
-        for k, v in cls._races.items():
-            if v == arg:
-                return k
-        return None
+        return cls._ids.get(arg)
 
     @classmethod
     def KR(cls, arg):
-        if arg in cls._races.values():
+        if arg in cls._ids:
             return arg
-        if arg in cls._races:
-            return cls._races[arg]
-        return None
+        return cls._races.get(arg)
 
 class CLASS:
     _classes = dict()
+    _ids = dict()
+
+    @classmethod
+    def load(cls, classes):
+        cls._classes, cls._ids = dict(classes), {v: k for k, v in classes.items()}
 
     @classmethod
     def ID(cls, arg):
-        if arg in _classes:
+        if arg in cls._classes:
             return arg
-        for k, v in cls._classes.items():
-            if v == arg:
-                return k
-        return None
+        return cls._ids.get(arg)
 
     @classmethod
     def KR(cls, arg):
-        if arg in cls._classes.values():
+        if arg in cls._ids:
             return arg
-        if arg in cls._classes:
-            return cls._classes[arg]
-        return None
+        return cls._classes.get(arg)
 
 class DUNGEON:
     _dungeons = dict()
+    _names = dict()
+
+    @classmethod
+    def load(cls, dungeons):
+        cls._dungeons, cls._names = dict(dungeons), {v: k for k, v in dungeons.items()}
 
     @classmethod
     def KR(cls, arg):
-        if arg in cls._dungeons.values():
+        if arg in cls._names:
             return arg
-        if arg.lower() in cls._dungeons:
-            return cls._dungeons[arg.lower()]
-        return None
+        return cls._dungeons.get(arg.lower())
 
     @classmethod
     def EN(cls, arg):
         if arg.lower() in cls._dungeons:
             return arg
-        for k, v in cls._dungeons.items():
-            if v == arg:
-                return k
-        return None
+        return cls._names.get(arg)
 
 class WCL_SPEC:
     def __init__(self, class_id, spec_id, name_en, icon, abbreviations):
@@ -192,12 +246,42 @@ class WCL_CLASS:
             return cls._classes[name]
         return None
 
+    _abbreviations = dict()
+    _spec_names = dict()
+
+    @classmethod
+    def _build_index(cls):
+        for name, spec in cls._classes.items():
+            spec.name = name
+            cls._spec_names.setdefault(spec.class_id, set()).add(spec.abbreviations[0])
+            for abbr in spec.abbreviations:
+                cls._abbreviations.setdefault(abbr, []).append(spec)
+
+    @classmethod
+    def spec_names(cls, class_id):
+        """직업의 전문화 이름('혈기', '냉기', ...) 집합을 리턴합니다."""
+        return cls._spec_names.get(class_id, set())
+
+    @classmethod
+    def find_by_abbreviation(cls, abbr):
+        """
+        줄임말에 해당하는 모든 전문화를 리턴합니다. '냉기'처럼 여러 직업의 전문화에
+        해당하는 줄임말은 후보가 여러 개입니다.
+        """
+        return cls._abbreviations.get(abbr, [])
+
     @classmethod
     def get_by_abbreviation(cls, abbr):
-        for i in cls._classes.values():
-            if abbr in i.abbreviations:
-                return i
-        return None
+        specs = cls.find_by_abbreviation(abbr)
+        return specs[0] if len(specs) > 0 else None
+
+WCL_CLASS._build_index()
+
+def _normalize(name):
+    return re.sub(r"[\s\-'’]", "", name).lower()
+
+def _deletions(key):
+    return [key] + [key[:i] + key[i + 1:] for i in range(len(key))]
 
 def thumbnail(name):
     return "https://wow.zamimg.com/images/wow/icons/large/{}.jpg".format(name)
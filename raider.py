@@ -1,7 +1,8 @@
 import asyncio
-import aiohttp
 
 from utils import encode
+from client import HttpClient
+from models import RaiderProfile
 import logger
 import config
 from params import *
@@ -9,33 +10,36 @@ from params import *
 
 class Raider:
     BASE = "https://raider.io/api/v1"
+    _client = HttpClient(
+        "raider",
+        rate=float(config.get("ratelimit_raider_rate")),
+        burst=int(config.get("ratelimit_raider_burst")))
 
     @classmethod
     async def get_weekly_affixes(cls):
         query = "?region={}&locale={}".format(REGION, LOCALE)
         url = encode("{}/mythic-plus/affixes".format(cls.BASE), query)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error("Failed to get weekly affixes from raider.")
-                    return None
+        status, data = await cls._client.get_json(url, endpoint="weekly affixes")
+        if status == 200:
+            return data
+        else:
+            logger.error("Failed to get weekly affixes from raider.")
+            return None
 
     @classmethod
     async def get_character(cls, realm_name, character_name):
         query = "?region={}".format(REGION) \
                 + "&realm={}".format(REALM.EN(realm_name)) \
-                + "&name={}".format(character_name) \
+                + "&name={}".format(character_name.lower()) \
                 + "&fields=gear,mythic_plus_scores_by_season:current," \
                 + "mythic_plus_weekly_highest_level_runs"
         url = encode("{}/characters/profile".format(cls.BASE), query)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error("Failed to get character from raider.")
-                    return None
+        status, data = await cls._client.get_json(
+            url, ttl=300, endpoint="character", model=RaiderProfile)
+        if status == 200:
+            return data
+        else:
+            logger.error("Failed to get character from raider.")
+            return None
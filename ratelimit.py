@@ -0,0 +1,137 @@
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+from email.utils import parsedate_to_datetime
+
+import logger
+
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority = contextvars.ContextVar("priority", default=INTERACTIVE)
+
+
+def set_priority(priority):
+    """
+    현재 태스크와 이 태스크에서 만들어지는 태스크들이 보내는 API 요청의 우선순위를 정합니다.
+    길드원 조회나 경매장 갱신 같은 백그라운드 작업은 BACKGROUND로 설정해, 명령어 처리
+    요청(INTERACTIVE)이 먼저 처리되도록 합니다.
+    """
+    _priority.set(priority)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self):
+        """토큰 하나를 쓸 수 있을 때까지 남은 시간(초)입니다."""
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    upstream 하나에 대한 요청 속도를 초당/시간당 토큰 버킷으로 제한합니다.
+    토큰이 없으면 요청은 우선순위 큐에서 기다리며, 우선순위가 높은(값이 작은) 요청부터
+    순서대로 토큰을 받습니다. 서버가 429와 Retry-After를 응답하면 그 시간 동안 모든 요청을
+    멈춥니다.
+
+    Parameters
+    ---
+    name : 로그에 표시할 upstream 이름
+    rate : 초당 최대 요청 수
+    burst : 한 번에 몰아서 보낼 수 있는 최대 요청 수
+    hourly : 시간당 최대 요청 수 (없으면 제한하지 않음)
+    """
+    def __init__(self, name, rate, burst, hourly=None):
+        self.name = name
+        self._buckets = [TokenBucket(rate, burst)]
+        if hourly is not None:
+            self._buckets.append(TokenBucket(hourly / 3600, hourly))
+        self._blocked_until = 0
+        self._waiters = list()
+        self._sequence = itertools.count()
+        self._dispatcher = None
+        self.stats = {
+            "requests": 0,
+            "waited": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+            "throttled": 0,
+        }
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def _delay(self):
+        return max([self._blocked_until - time.monotonic()] + [b.delay() for b in self._buckets])
+
+    def _take(self):
+        for b in self._buckets:
+            b.take()
+        self.stats["requests"] += 1
+
+    async def acquire(self):
+        if len(self._waiters) == 0 and self._delay() <= 0:
+            self._take()
+            return
+
+        started = time.monotonic()
+        future = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (_priority.get(), next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+        waited = time.monotonic() - started
+        self.stats["waited"] += 1
+        self.stats["wait_time"] += waited
+        self.stats["max_wait"] = max(self.stats["max_wait"], waited)
+
+    async def _dispatch(self):
+        while len(self._waiters) > 0:
+            delay = self._delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._take()
+                future.set_result(None)
+
+    def block(self, seconds):
+        self.stats["throttled"] += 1
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        logger.warning("Rate limited by {}; pausing requests for {:.1f}s.", self.name, seconds)
+
+
+def retry_after(response, default=1.0):
+    """429 응답의 Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 바꿉니다."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,117 @@
+import time
+
+import logger
+from params import *
+from raider import Raider
+from blizzard import Blizzard
+from fanout import fan_out
+
+
+class RosterTracker:
+    """
+    길드원들의 이번주 쐐기 던전 기록을 백그라운드에서 주기적으로 갱신해 두는 표입니다.
+    매번 모든 길드원을 조회하지 않고, 길드원 목록의 변화(새로 들어온 캐릭터, 만렙 달성,
+    lastModified 변경)와 마지막으로 조회한 시각을 보고 바뀌었을 가능성이 있는 캐릭터만
+    다시 조회합니다. 쐐기 던전 주간 기간이 바뀌면 모든 캐릭터를 다시 조회하며, 다시 조회하지
+    못한 캐릭터는 표에 넣지 않습니다. failed는 마지막 갱신에서 불러오지 못한 캐릭터 수이고,
+    updated_at은 표를 만든 시각(time.time())입니다.
+
+    Parameters
+    ---
+    realm_name : 길드 서버 이름
+    guild_name : 길드 이름
+    max_age : 변화가 없어도 다시 조회하기까지의 시간 (초)
+    """
+    CATEGORIES = ["15단 이상", "10단 이상", "10단 미만", "쐐기 간 적 없음"]
+
+    def __init__(self, realm_name, guild_name, max_age=3600):
+        self.realm_name = realm_name
+        self.guild_name = guild_name
+        self.max_age = max_age
+        self.table = None
+        self.period = None
+        self.updated_at = None
+        self.total = 0
+        self.failed = 0
+        self._members = dict()
+        self._period_id = None
+
+    @property
+    def ready(self):
+        return self.table is not None
+
+    async def update(self, concurrency=8, timeout=10):
+        roster = await Blizzard.get_guild_members(self.realm_name, self.guild_name)
+        if roster is None:
+            return False
+
+        period = await Blizzard.get_mythic_keystone_period()
+        if period is not None and period["id"] != self._period_id:
+            self._period_id = period["id"]
+            self.period = period
+            # 지난주 기록이 이번주 기록으로 보이지 않도록, 다시 조회하기 전까지는 표에서 뺍니다.
+            for member in self._members.values():
+                member["profile"] = None
+                member["crawled"] = None
+
+        current = dict()
+        for member in roster["members"]:
+            if member["character"]["level"] >= MAX_LEVEL:
+                current[member["character"]["name"]] = member["character"].get("lastModified")
+        for name in list(self._members):
+            if name not in current:
+                del self._members[name]
+
+        now = time.monotonic()
+        stale = list()
+        for name, last_modified in current.items():
+            member = self._members.setdefault(
+                name, {"profile": None, "last_modified": None, "crawled": None})
+            if member["crawled"] is None or member["last_modified"] != last_modified \
+                    or now - member["crawled"] > self.max_age:
+                stale.append(name)
+
+        res = await fan_out(
+            stale,
+            lambda m: Raider.get_character(self.realm_name, m),
+            concurrency=concurrency,
+            timeout=timeout,
+            name="Guild roster update")
+        for name, profile in zip(stale, res.results):
+            if profile is not None:
+                self._members[name].update(
+                    profile=profile, last_modified=current[name], crawled=now)
+
+        self.total = len(current)
+        self.failed = res.total - res.succeeded
+        self._materialize()
+        logger.info("Updated guild roster: {} members, {} re-crawled.",
+            len(current), len(stale))
+        return True
+
+    def _materialize(self):
+        table = {c: [] for c in self.CATEGORIES}
+        for member in self._members.values():
+            m = member["profile"]
+            if m is None or m.score <= 0:
+                continue
+            if m.weekly_best is not None:
+                best_run = m.weekly_best
+                if best_run.mythic_level >= 15:
+                    category = "15단 이상"
+                elif best_run.mythic_level >= 10:
+                    category = "10단 이상"
+                else:
+                    category = "10단 미만"
+                table[category].append((best_run.mythic_level, m.name))
+            else:
+                table["쐐기 간 적 없음"].append((0, m.name))
+
+        self.table = dict()
+        for c in self.CATEGORIES:
+            rows = sorted(table[c], key=lambda r: (-r[0], r[1]))
+            if c == "쐐기 간 적 없음":
+                self.table[c] = [name for _, name in rows]
+            else:
+                self.table[c] = ["{}({})".format(name, level) for level, name in rows]
+        self.updated_at = time.time()
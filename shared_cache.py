@@ -0,0 +1,148 @@
+import time
+import queue
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import logger
+
+
+class SharedCache:
+    """
+    같은 컴퓨터에서 실행되는 여러 봇 프로세스(샤드 워커)가 함께 사용하는 응답 캐시입니다.
+    SQLite 파일을 WAL 모드로 열어 여러 프로세스가 동시에 읽고 쓸 수 있으며, 한 프로세스가
+    받아 온 응답을 다른 프로세스는 API를 호출하지 않고 사용할 수 있습니다.
+    프로세스마다 시계 기준이 다르지 않도록 만료 시각은 time.time()(초)으로 저장하며,
+    응답 본문은 받은 그대로(bytes) 저장합니다. 오류가 나면 캐시가 없는 것처럼 동작합니다.
+    SQLite 호출은 이벤트 루프를 멈추지 않도록 별도 스레드에서 실행합니다. get()은 읽기
+    전용 스레드에서 실행되는 코루틴이고, set(), touch(), delete()는 쓰기 스레드의 큐에
+    넣기만 하고 바로 리턴합니다. 쓰기 스레드는 큐에 쌓인 쓰기를 한 트랜잭션으로 모아
+    저장하므로, 다른 프로세스가 쓰는 동안 잠금을 기다리는 것도 이 스레드뿐입니다.
+    파일을 열거나 만들 수 없으면 생성자에서 sqlite3.Error가 발생합니다.
+
+    Parameters
+    ---
+    path : SQLite 파일 경로
+    max_entries : 저장할 수 있는 최대 항목 수
+    """
+    PRUNE_INTERVAL = 500
+    BATCH_SIZE = 200
+
+    def __init__(self, path, max_entries=20000):
+        self.path = path
+        self.max_entries = max_entries
+        self._writes = 0
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body BLOB NOT NULL, expires_at REAL NOT NULL, "
+                "etag TEXT, last_modified TEXT, updated REAL NOT NULL)")
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_updated ON responses (updated)")
+            db.commit()
+        finally:
+            db.close()
+
+        self._read_db = None
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-cache-reader")
+        self._queue = queue.SimpleQueue()
+        self._writer = threading.Thread(
+            target=self._write_loop, name="shared-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=1)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    async def get(self, key):
+        """저장된 (본문, 만료 시각, ETag, Last-Modified)를 리턴합니다. 만료된 항목도 리턴합니다."""
+        return await asyncio.get_event_loop().run_in_executor(self._reader, self._get, key)
+
+    def _get(self, key):
+        try:
+            if self._read_db is None:
+                self._read_db = self._connect()
+            return self._read_db.execute(
+                "SELECT body, expires_at, etag, last_modified FROM responses WHERE key = ?",
+                (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Failed to read shared cache: {}", e)
+            return None
+
+    def set(self, key, body, expires_at, etag=None, last_modified=None):
+        self._queue.put((
+            "INSERT OR REPLACE INTO responses "
+            "(key, body, expires_at, etag, last_modified, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, body, expires_at, etag, last_modified, time.time())))
+
+    def touch(self, key, expires_at):
+        """서버가 304로 응답한 항목의 만료 시각만 늦춥니다."""
+        self._queue.put((
+            "UPDATE responses SET expires_at = ?, updated = ? WHERE key = ?",
+            (expires_at, time.time(), key)))
+
+    def delete(self, key):
+        self._queue.put(("DELETE FROM responses WHERE key = ?", (key,)))
+
+    def _write_loop(self):
+        db = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.BATCH_SIZE:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = None in batch
+                self._write(db, [w for w in batch if w is not None])
+        finally:
+            db.close()
+
+    def _write(self, db, batch):
+        if len(batch) == 0:
+            return
+        try:
+            for statement, params in batch:
+                db.execute(statement, params)
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            logger.error("Failed to write shared cache: {}", e)
+            return
+
+        previous, self._writes = self._writes, self._writes + len(batch)
+        if previous // self.PRUNE_INTERVAL != self._writes // self.PRUNE_INTERVAL:
+            self._prune(db)
+
+    def _prune(self, db):
+        """최근에 저장하거나 갱신하지 않은 항목부터 지워 max_entries개만 남깁니다."""
+        try:
+            deleted = db.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY updated DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)).rowcount
+            db.commit()
+        except sqlite3.Error as e:
+            db.rollback()
+            logger.error("Failed to prune shared cache: {}", e)
+            return
+        if deleted > 0:
+            logger.debug("Pruned {} entries from shared cache.", deleted)
+
+    def _close_reader(self):
+        if self._read_db is not None:
+            self._read_db.close()
+            self._read_db = None
+
+    def close(self):
+        """큐에 남은 쓰기를 모두 저장한 뒤 스레드를 멈춥니다."""
+        self._queue.put(None)
+        self._writer.join()
+        self._reader.submit(self._close_reader).result()
+        self._reader.shutdown()
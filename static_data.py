@@ -0,0 +1,77 @@
+import os
+import json
+import time
+import asyncio
+
+import logger
+from params import *
+from blizzard import Blizzard
+
+
+def apply(data):
+    """저장된 정적 데이터로 종족, 서버, 직업, 던전 표를 교체합니다."""
+    RACE.load({int(k): v for k, v in data["races"].items()})
+    REALM.load(data["realms"])
+    CLASS.load({int(k): v for k, v in data["classes"].items()})
+    DUNGEON.load(data["dungeons"])
+
+
+def load(path):
+    """
+    디스크에 저장된 정적 데이터를 동기적으로 읽어 적용합니다. 봇이 로그인하기 전에
+    호출하므로, API를 기다리지 않고 첫 명령어부터 서버 이름 등을 확인할 수 있습니다.
+    저장된 시각(초)을 리턴하며, 파일이 없거나 읽을 수 없으면 None을 리턴합니다.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        apply(data)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error("Failed to load static data from '{}': {}", path, e)
+        return None
+    logger.info("Loaded static data from '{}' ({}).",
+        path, time.strftime("%Y-%m-%d %H:%M", time.localtime(data["updated"])))
+    return data["updated"]
+
+
+async def fetch():
+    """API에서 정적 데이터를 동시에 받아옵니다. 하나라도 실패하면 None을 리턴합니다."""
+    races, realms, classes, dungeons_kr, dungeons_en = await asyncio.gather(
+        Blizzard.get_races(),
+        Blizzard.get_realms(),
+        Blizzard.get_classes(),
+        Blizzard.get_dungeons_kr(),
+        Blizzard.get_dungeons_en())
+    if None in (races, realms, classes, dungeons_kr, dungeons_en):
+        return None
+
+    data = {
+        "updated": int(time.time()),
+        "races": {i["id"]: i["name"] for i in races["races"]},
+        "realms": {i["name"]: i["slug"] for i in realms["realms"]},
+        "classes": {i["id"]: i["name"] for i in classes["classes"]},
+        "dungeons": dict(),
+    }
+    dungeons = {i["id"]: i["name"].lower() for i in dungeons_en["dungeons"]}
+    for i in dungeons_kr["dungeons"]:
+        if i["id"] in dungeons:
+            data["dungeons"][dungeons[i["id"]]] = i["name"]
+    return data
+
+
+async def refresh(path):
+    """정적 데이터를 새로 받아 적용하고 디스크에 저장합니다."""
+    data = await fetch()
+    if data is None:
+        logger.error("Failed to refresh static data.")
+        return False
+
+    apply(data)
+    temp = "{}.tmp".format(path)
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temp, path)
+    logger.info("Refreshed static data.")
+    return True
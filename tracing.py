@@ -0,0 +1,88 @@
+import time
+import contextvars
+from collections import deque
+import aiohttp
+
+import logger
+import config
+import metrics
+
+
+current_command = contextvars.ContextVar("current_command", default=None)
+
+slow_calls = deque(maxlen=50)
+latency = dict()
+
+
+class Span:
+    """
+    upstream 요청 하나의 시간 정보입니다. aiohttp trace 훅으로 DNS 조회, 연결, 첫 바이트
+    수신(TTFB)까지 걸린 시간을 기록하며, 단위는 초입니다. 재사용한 연결은 DNS와 연결
+    시간이 0입니다.
+    """
+    __slots__ = ("upstream", "endpoint", "command", "status", "bytes",
+                 "started", "dns", "connect", "ttfb", "total", "_marks")
+
+    def __init__(self, upstream, endpoint):
+        self.upstream = upstream
+        self.endpoint = endpoint
+        self.command = current_command.get()
+        self.status = None
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self.dns = 0.0
+        self.connect = 0.0
+        self.ttfb = None
+        self.total = None
+        self._marks = dict()
+
+    def __str__(self):
+        return "{} {} {:.0f}ms (dns {:.0f}ms, connect {:.0f}ms, ttfb {}, {} bytes, status {}, command {})".format(
+            self.upstream, self.endpoint, self.total * 1000, self.dns * 1000, self.connect * 1000,
+            "-" if self.ttfb is None else "{:.0f}ms".format(self.ttfb * 1000),
+            self.bytes, self.status, self.command)
+
+
+def finish(span):
+    """요청이 끝난 span을 기록하고, 설정한 시간보다 오래 걸렸다면 느린 요청으로 남깁니다."""
+    span.total = time.perf_counter() - span.started
+    key = (span.upstream, span.endpoint)
+    if key not in latency:
+        latency[key] = metrics.Histogram()
+    latency[key].observe(span.total)
+
+    if span.total * 1000 >= int(config.get("tracing_slow_ms", 1000)):
+        slow_calls.append(span)
+        logger.warning("Slow call: {}", span)
+
+
+def _mark(name):
+    async def callback(session, trace_config_ctx, params):
+        span = trace_config_ctx.trace_request_ctx
+        if isinstance(span, Span):
+            span._marks[name] = time.perf_counter()
+    return callback
+
+
+def _measure(start, attr):
+    async def callback(session, trace_config_ctx, params):
+        span = trace_config_ctx.trace_request_ctx
+        if isinstance(span, Span) and start in span._marks:
+            setattr(span, attr, time.perf_counter() - span._marks[start])
+    return callback
+
+
+async def _on_request_end(session, trace_config_ctx, params):
+    span = trace_config_ctx.trace_request_ctx
+    if isinstance(span, Span):
+        span.ttfb = time.perf_counter() - span.started
+
+
+def trace_config():
+    tc = aiohttp.TraceConfig()
+    tc.on_dns_resolvehost_start.append(_mark("dns"))
+    tc.on_dns_resolvehost_end.append(_measure("dns", "dns"))
+    tc.on_connection_create_start.append(_mark("connect"))
+    tc.on_connection_create_end.append(_measure("connect", "connect"))
+    tc.on_request_end.append(_on_request_end)
+    return tc
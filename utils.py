@@ -10,10 +10,11 @@ def encode(base, url):
     return encoded
 
 def parse_character_name(arg):
-    cnt = arg.count("-")
-    if cnt < 1:
+    # 캐릭터 이름에는 '-'가 들어갈 수 없으므로, 첫 '-' 뒤는 모두 서버 이름입니다.
+    # (예: 팬더곰-burning-legion)
+    if arg.count("-") < 1:
         return arg, config.get("default_realm")
-    elif cnt == 1:
-        return arg.split("-")
-    else:
-        return parse_character_name(arg.split("-")[0])
+    return arg.split("-", 1)
+
+def to_gold(copper):
+    return int(copper / 10000)
@@ -1,7 +1,7 @@
 import asyncio
-import aiohttp
 
 from utils import encode
+from client import HttpClient
 import logger
 import config
 from params import *
@@ -9,16 +9,19 @@ from params import *
 
 class Warcraftlogs:
     BASE = "https://www.warcraftlogs.com/v1"
+    _client = HttpClient(
+        "warcraftlogs",
+        rate=float(config.get("ratelimit_warcraftlogs_rate")),
+        burst=int(config.get("ratelimit_warcraftlogs_burst")))
 
     @classmethod
     async def get_classes(cls):
         query = "?api_key={}".format(config.get("warcraftlogs_token"))
         url = encode("{}/class".format(cls.BASE), query)
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    logger.error("Failed to get classes from warcraftlogs.")
-                    return None
+        status, data = await cls._client.get_json(url, endpoint="classes")
+        if status == 200:
+            return data
+        else:
+            logger.error("Failed to get classes from warcraftlogs.")
+            return None